@@ -0,0 +1,136 @@
+"""Incremental stripping of a leading JSON object from a streamed response.
+
+Kept free of Streamlit/websocket imports and fully annotated so the module
+can be compiled with mypyc (``mypyc client/_prefix_scanner.py``) without
+changing call sites.
+"""
+
+import json
+from functools import lru_cache
+from typing import Any
+
+
+# Keys checked in order when summarizing a leading JSON object.
+_TOOL_KEYS = ("tools", "tool_calls", "called_tools", "tools_used")
+_THOUGHT_KEYS = ("thoughts", "analysis", "reasoning", "plan")
+
+
+def _format_json_prefix(obj: dict[str, Any]) -> str:
+    """Turn a leading JSON object into human-readable text.
+
+    We look for common keys like tools/tool_calls and thoughts/analysis.
+    If we don't recognize the structure, we simply omit the JSON.
+    
+    Args:
+        obj: Parsed JSON object (dict).
+        
+    Returns:
+        str: Human-readable text representation or empty string if not recognized.
+    """
+    tools = next((obj[k] for k in _TOOL_KEYS if obj.get(k)), None)
+    thoughts = next((obj[k] for k in _THOUGHT_KEYS if obj.get(k)), None)
+
+    parts: list[str] = []
+
+    if tools:
+        parts.append("Investigation Steps:\n")
+        if isinstance(tools, list):
+            for idx, t in enumerate(tools, 1):
+                if isinstance(t, str):
+                    name = t
+                elif isinstance(t, dict):
+                    name = t.get("name") or t.get("tool") or json.dumps(t)
+                else:
+                    name = str(t)
+                parts.append(f"{idx}. {name}\n")
+        else:
+            parts.append(f"- Tools: {tools}\n")
+
+    if thoughts:
+        parts.append("\nThoughts:\n")
+        parts.append(str(thoughts).strip() + "\n\n")
+
+    return "".join(parts)
+
+
+@lru_cache(maxsize=256)
+def _format_json_prefix_cached(candidate: str) -> str:
+    """Parse and format a leading JSON object, memoized on its raw text.
+
+    Agents often repeat the same metadata header across turns, so the raw
+    JSON text doubles as a cache key without re-serializing.
+
+    Raises:
+        json.JSONDecodeError: If `candidate` is not valid JSON.
+    """
+    return _format_json_prefix(json.loads(candidate))
+
+
+class PrefixScanner:
+    """Incrementally detect and strip a leading JSON object from the token stream.
+
+    State (brace depth, in-string and escape flags) persists across calls, so
+    every received character is inspected exactly once and ``json.loads`` runs
+    only when the leading object closes.
+    """
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.started = False
+        self.leading: list[str] = []
+        self.buf: list[str] = []
+
+    def feed(self, chunk: str) -> tuple[str, str, bool]:
+        """Consume the next token of the stream.
+
+        Args:
+            chunk: Newly received token text (str).
+
+        Returns:
+            tuple[str, str, bool]: (replacement_text, remaining_text, still_in_prefix).
+            - replacement_text: human-readable text to emit instead of JSON
+            - remaining_text: any non-JSON content that follows immediately
+            - still_in_prefix: whether we are still unsure and should keep buffering
+        """
+        start = 0
+        for i, ch in enumerate(chunk):
+            if not self.started:
+                if ch.isspace():
+                    self.leading.append(ch)
+                    continue
+                if ch != "{":
+                    return "", "".join(self.leading) + chunk[i:], False
+                self.started = True
+                start = i
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+            elif ch == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.buf.append(chunk[start : i + 1])
+                    candidate = "".join(self.buf)
+                    try:
+                        replacement = _format_json_prefix_cached(candidate)
+                    except json.JSONDecodeError:
+                        return "", "".join(self.leading) + candidate + chunk[i + 1 :], False
+                    return replacement, chunk[i + 1 :], False
+
+        if self.started:
+            self.buf.append(chunk[start:])
+        return "", "", True
+
+    def pending(self) -> str:
+        """Return the raw text buffered so far (for flushing an unterminated prefix)."""
+        return "".join(self.leading) + "".join(self.buf)
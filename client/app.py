@@ -4,15 +4,25 @@ Connects to the backend via WebSocket (URL from env JEWELRYOPS_WS_URL or default
 Streams assistant response token-by-token and filters leading JSON from the agent.
 """
 
+import atexit
 import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from typing import Iterator
 
-import streamlit as st
-from websocket import create_connection
+from _prefix_scanner import PrefixScanner
+
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
+# Token frames arrive as binary: this tag followed by the UTF-8 token text.
+# Control frames (done/error) stay JSON text.
+TOKEN_FRAME_TAG = b"T"
 
 
 def _default_ws_url() -> str:
@@ -36,11 +46,21 @@ def setup_client_logging() -> logging.Logger:
 
     ch = logging.StreamHandler()
     ch.setFormatter(fmt)
-    logger.addHandler(ch)
 
     fh = RotatingFileHandler(logs_dir / "client.log", maxBytes=2_000_000, backupCount=3)
     fh.setFormatter(fmt)
-    logger.addHandler(fh)
+    # Write the file in batches; ERROR and above flush immediately.
+    # Records keep their creation time, so asctime stays accurate.
+    buffered_fh = MemoryHandler(capacity=256, flushLevel=logging.ERROR, target=fh)
+
+    # Console and file I/O (incl. rotation checks) run on the listener thread;
+    # logging calls from the stream loop only enqueue the record.
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(-1)
+    listener = QueueListener(log_queue, ch, buffered_fh, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    logger.addHandler(QueueHandler(log_queue))
     return logger
 
 
@@ -63,44 +83,45 @@ def ws_token_stream(ws_url: str, session_id: str, message: str) -> Iterator[str]
         message: User query text (str).
         
     Yields:
-        str: Individual tokens from the agent response.
+        str: Text chunks from the agent response (one per WS token frame).
         
     Raises:
         RuntimeError: If the server sends an error message.
     """
+    from websocket import ABNF, create_connection
+
     LOGGER.info("Connecting ws_url=%s session_id=%s", ws_url, session_id)
     ws = create_connection(ws_url, timeout=60)
     try:
         ws.send(json.dumps({"session_id": session_id, "message": message}))
-        prefix_buffer = ""
         in_prefix = True
+        scanner = PrefixScanner()
         
         while True:
-            raw = ws.recv()
-            payload = json.loads(raw)
-            t = payload.get("type")
-            if t == "token":
+            opcode, raw = ws.recv_data()
+            if opcode == ABNF.OPCODE_BINARY and raw[:1] == TOKEN_FRAME_TAG:
+                t, token = "token", raw[1:].decode("utf-8")
+            else:
+                payload = _loads(raw)
+                t = payload.get("type")
                 token = payload.get("data") or ""
+            if t == "token":
                 if in_prefix:
-                    prefix_buffer += token
-                    replacement, remaining, still_prefix = _process_leading_json(prefix_buffer)
-                    in_prefix = still_prefix
+                    replacement, remaining, in_prefix = scanner.feed(token)
 
                     if not in_prefix:
                         if replacement:
-                            for ch in replacement:
-                                yield ch
+                            yield replacement
                         if remaining:
-                            for ch in remaining:
-                                yield ch
-                else:
-                    for ch in token:
-                        yield ch
+                            yield remaining
+                elif token:
+                    yield token
 
             elif t == "done":
-                if in_prefix and prefix_buffer:
-                    for ch in prefix_buffer:
-                        yield ch
+                if in_prefix:
+                    pending = scanner.pending()
+                    if pending:
+                        yield pending
                 LOGGER.info(
                     "WS done session_id=%s tool_calls=%s",
                     payload.get("session_id"),
@@ -121,125 +142,46 @@ def _is_json_object(s: str) -> bool:
     return s.startswith("{") and s.endswith("}")
 
 
-def _format_json_prefix(obj: dict) -> str:
-    """Turn a leading JSON object into human-readable text.
-
-    We look for common keys like tools/tool_calls and thoughts/analysis.
-    If we don't recognize the structure, we simply omit the JSON.
-    
-    Args:
-        obj: Parsed JSON object (dict).
-        
-    Returns:
-        str: Human-readable text representation or empty string if not recognized.
-    """
-    if not isinstance(obj, dict):
-        return ""
-
-    tools = (
-        obj.get("tools")
-        or obj.get("tool_calls")
-        or obj.get("called_tools")
-        or obj.get("tools_used")
-    )
-    thoughts = (
-        obj.get("thoughts")
-        or obj.get("analysis")
-        or obj.get("reasoning")
-        or obj.get("plan")
-    )
-
-    parts: list[str] = []
-
-    if tools:
-        parts.append("Investigation Steps:\n")
-        if isinstance(tools, list):
-            for idx, t in enumerate(tools, 1):
-                if isinstance(t, str):
-                    name = t
-                elif isinstance(t, dict):
-                    name = t.get("name") or t.get("tool") or json.dumps(t)
-                else:
-                    name = str(t)
-                parts.append(f"{idx}. {name}\n")
-        else:
-            parts.append(f"- Tools: {tools}\n")
+def main() -> None:
+    """Render the Streamlit chat UI."""
+    import streamlit as st
 
-    if thoughts:
-        parts.append("\nThoughts:\n")
-        parts.append(str(thoughts).strip() + "\n\n")
+    st.set_page_config(page_title="JewelryOps Agent", page_icon="💎", layout="centered")
 
-    return "".join(parts)
+    st.title("JewelryOps Agent")
 
+    with st.sidebar:
+        st.subheader("Connection")
+        session_id = st.text_input("Session ID", value=st.session_state.get("session_id", "streamlit-demo"))
+        st.session_state["session_id"] = session_id
+        st.markdown("---")
+        if st.button("Clear chat"):
+            st.session_state["messages"] = []
 
-def _process_leading_json(prefix_buffer: str) -> tuple[str, str, bool]:
-    """Detect and strip a leading JSON object from the buffer, if present.
-
-    Returns (replacement_text, remaining_text, still_in_prefix).
-    - replacement_text: human-readable text to emit instead of JSON
-    - remaining_text: any non-JSON content that follows immediately
-    - still_in_prefix: whether we are still unsure and should keep buffering
-    
-    Args:
-        prefix_buffer: Accumulated token prefix to check for JSON (str).
-        
-    Returns:
-        tuple[str, str, bool]: (replacement_text, remaining_text, still_in_prefix).
-    """
-    s = prefix_buffer.lstrip()
-    if not s:
-        return "", "", True
-
-    if not s.startswith("{"):
-        return "", prefix_buffer, False
-
-    last_brace = s.rfind("}")
-    if last_brace == -1:
-        return "", "", True
-
-    candidate = s[: last_brace + 1]
-    try:
-        obj = json.loads(candidate)
-    except json.JSONDecodeError:
-        return "", "", True
-
-    replacement = _format_json_prefix(obj)
-    remaining = s[last_brace + 1 :]
-    return replacement, remaining, False
-
-
-st.set_page_config(page_title="JewelryOps Agent", page_icon="💎", layout="centered")
-
-st.title("JewelryOps Agent")
-
-with st.sidebar:
-    st.subheader("Connection")
-    session_id = st.text_input("Session ID", value=st.session_state.get("session_id", "streamlit-demo"))
-    st.session_state["session_id"] = session_id
-    st.markdown("---")
-    if st.button("Clear chat"):
+    if "messages" not in st.session_state:
         st.session_state["messages"] = []
 
-if "messages" not in st.session_state:
-    st.session_state["messages"] = []
+    ws_url = _default_ws_url()
+
+    for m in st.session_state["messages"]:
+        with st.chat_message(m["role"]):
+            st.markdown(m["content"])
 
-ws_url = _default_ws_url()
+    prompt = st.chat_input("Ask about an order, customer, or inventory issue…")
+    if prompt:
+        st.session_state["messages"].append({"role": "user", "content": prompt})
+        with st.chat_message("user"):
+            st.markdown(prompt)
 
-for m in st.session_state["messages"]:
-    with st.chat_message(m["role"]):
-        st.markdown(m["content"])
+        with st.chat_message("assistant"):
+            try:
+                full = st.write_stream(ws_token_stream(ws_url, session_id, prompt))
+            except (ConnectionError, TimeoutError, RuntimeError) as e:
+                full = f"Error: {e}"
+                st.error(full)
 
-prompt = st.chat_input("Ask about an order, customer, or inventory issue…")
-if prompt:
-    st.session_state["messages"].append({"role": "user", "content": prompt})
-    with st.chat_message("user"):
-        st.markdown(prompt)
+        st.session_state["messages"].append({"role": "assistant", "content": full})
 
-    with st.chat_message("assistant"):
-        try:
-            full = st.write_stream(ws_token_stream(ws_url, session_id, prompt))
-        except (ConnectionError, TimeoutError, RuntimeError) as e:
-            full = f"Error: {e}"
-            st.error(full)
 
-    st.session_state["messages"].append({"role": "assistant", "content": full})
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""JSON helpers and the mtime-keyed file cache shared by the MCP servers.
+
+The servers are launched as scripts (``python mcp_servers/<name>/server.py``),
+so each one puts this directory on ``sys.path`` before importing it.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Callable, Generic, TypeVar
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj: Any, *, indent: bool = True, default: Callable[[Any], Any] | None = None) -> str:
+    """Serialize to JSON text, two-space indented by default (orjson when available)."""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else None
+        return orjson.dumps(obj, option=option, default=default).decode()
+    return json.dumps(obj, indent=2 if indent else None, default=default)
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse JSON text or bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+_T = TypeVar("_T")
+
+
+class MtimeCache(Generic[_T]):
+    """A JSON data file parsed once and re-read only when its mtime changes.
+
+    ``build`` turns the decoded file into whatever the server serves from
+    memory (the rows plus any lookup indexes). ``save`` writes new contents
+    and rebuilds from them without reading the file back.
+    """
+
+    def __init__(self, path: Path, build: Callable[[Any], _T], *, indent: bool = True) -> None:
+        self.path = path
+        self._build = build
+        self._indent = indent
+        self._mtime: int | None = None
+        self._value: _T | None = None
+
+    def get(self) -> _T:
+        """Return the built value, reloading the file if it changed on disk.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        mtime = self.path.stat().st_mtime_ns
+        if self._value is None or mtime != self._mtime:
+            self._value = self._build(loads(self.path.read_bytes()))
+            self._mtime = mtime
+        return self._value
+
+    def save(self, data: Any) -> _T:
+        """Write `data` to the file and return the value built from it."""
+        self.path.write_text(dumps(data, indent=self._indent), encoding="utf-8")
+        self._value = self._build(data)
+        self._mtime = self.path.stat().st_mtime_ns
+        return self._value
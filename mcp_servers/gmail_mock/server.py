@@ -1,36 +1,94 @@
-import json
+import sys
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Callable, List, TypedDict
 
 try:
     from fastmcp import FastMCP
 except ImportError:
     from mcp.server.fastmcp import FastMCP
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from _common import MtimeCache, dumps as _dumps  # noqa: E402
+
 
 _DATA_DIR = Path(__file__).resolve().parent / "data"
 _DATA_DIR.mkdir(parents=True, exist_ok=True)
 _EMAILS_PATH = _DATA_DIR / "emails.json"
 
+# Shape of a stored email record ("from" is a keyword, hence the functional form).
+Email = TypedDict(
+    "Email",
+    {
+        "id": str,
+        "direction": str,
+        "from": str,
+        "to": str,
+        "subject": str,
+        "body": str,
+        "created_at": str,
+    },
+)
+
+
+def _search_blob(email: Email) -> str:
+    return (email.get("subject", "") + "\x00" + email.get("body", "")).lower()
+
+
+def _index_emails(emails: List[Email]) -> tuple[List[Email], List[Email], List[str]]:
+    """Return (emails in file order, emails newest first, search blobs).
+
+    sorted() is stable, so equal timestamps stay in file order (EMAIL-1
+    precedes EMAIL-2). Each blob is the lowercased subject and body of the
+    newest-first email at the same position.
+    """
+    newest = sorted(emails, key=lambda e: e.get("created_at", ""), reverse=True)
+    return emails, newest, [_search_blob(e) for e in newest]
+
+
+# emails.json, reloaded only when the file's mtime changes.
+_EMAILS = MtimeCache(_EMAILS_PATH, _index_emails, indent=False)
 
-def _load_emails() -> List[Dict[str, Any]]:
-    if not _EMAILS_PATH.exists():
-        _EMAILS_PATH.write_text("[]", encoding="utf-8")
-    with open(_EMAILS_PATH, encoding="utf-8") as f:
-        return json.load(f)
 
+def _load_emails() -> tuple[List[Email], List[Email], List[str]]:
+    # The cache's mtime stat doubles as the existence check.
+    try:
+        return _EMAILS.get()
+    except FileNotFoundError:
+        # First use: write the seed mailbox, which also fills the cache.
+        _ensure_seed_emails()
+        return _EMAILS.get()
 
-def _save_emails(emails: List[Dict[str, Any]]) -> None:
-    with open(_EMAILS_PATH, "w", encoding="utf-8") as f:
-        json.dump(emails, f, indent=2)
+
+def _save_emails(emails: List[Email]) -> None:
+    _EMAILS.save(emails)
+
+
+def _newest_first(
+    newest: List[Email],
+    limit: int,
+    match: Callable[[Email], bool] | None = None,
+) -> List[Email]:
+    """Return up to `limit` emails from `newest`, stopping once enough match."""
+    hits = iter(newest)
+    if match is not None:
+        hits = (e for e in hits if match(e))
+    return list(islice(hits, limit))
+
+
+def _limit_error(limit: int) -> str | None:
+    """Return an error payload for a negative `limit`, else None."""
+    if limit < 0:
+        return _dumps({"error": f"limit must be >= 0, got {limit}"})
+    return None
 
 
 def _ensure_seed_emails() -> None:
     if _EMAILS_PATH.exists():
         return
     now = datetime(2025, 2, 1, 13, 0, 0, tzinfo=timezone.utc).isoformat()
-    seed = [
+    seed: List[Email] = [
         {
             "id": "EMAIL-1",
             "direction": "in",
@@ -53,42 +111,39 @@ def _ensure_seed_emails() -> None:
     _save_emails(seed)
 
 
-_ensure_seed_emails()
-
 mcp = FastMCP("Gmail Mock", json_response=True)
 
 
 @mcp.tool()
 def list_emails(direction: str = "", limit: int = 20) -> str:
     """List mock emails, optionally filtered by direction ('in' or 'out')."""
-    emails = _load_emails()
-    if direction:
-        emails = [e for e in emails if e.get("direction") == direction]
-    emails_sorted = sorted(emails, key=lambda e: e.get("created_at", ""), reverse=True)
-    return json.dumps(emails_sorted[:limit], indent=2)
+    error = _limit_error(limit)
+    if error is not None:
+        return error
+    _, newest, _ = _load_emails()
+    match = (lambda e: e.get("direction") == direction) if direction else None
+    return _dumps(_newest_first(newest, limit, match))
 
 
 @mcp.tool()
 def search_emails(query: str, limit: int = 20) -> str:
     """Search emails by subject or body (case-insensitive)."""
-    emails = _load_emails()
+    error = _limit_error(limit)
+    if error is not None:
+        return error
+    _, newest, blobs = _load_emails()
     q = query.lower()
-    matches = [
-        e
-        for e in emails
-        if q in e.get("subject", "").lower() or q in e.get("body", "").lower()
-    ]
-    matches_sorted = sorted(matches, key=lambda e: e.get("created_at", ""), reverse=True)
-    return json.dumps(matches_sorted[:limit], indent=2)
+    hits = (e for e, blob in zip(newest, blobs) if q in blob)
+    return _dumps(list(islice(hits, limit)))
 
 
 @mcp.tool()
 def send_email(to: str, subject: str, body: str, sender: str = "support@jewelryops.test") -> str:
     """Send a mock email (adds an 'out' email record)."""
-    emails = _load_emails()
+    emails = _load_emails()[0]
     new_id = f"EMAIL-{len(emails) + 1}"
     now = datetime.now(timezone.utc).isoformat()
-    email = {
+    email: Email = {
         "id": new_id,
         "direction": "out",
         "from": sender,
@@ -97,9 +152,9 @@ def send_email(to: str, subject: str, body: str, sender: str = "support@jewelryo
         "body": body,
         "created_at": now,
     }
-    emails.append(email)
-    _save_emails(emails)
-    return json.dumps({"ok": True, "email": email}, indent=2)
+    # A new list, so the cached one only changes through _save_emails.
+    _save_emails([*emails, email])
+    return _dumps({"ok": True, "email": email})
 
 
 if __name__ == "__main__":
@@ -1,444 +1,541 @@
-import json
+import asyncio
+import atexit
+import functools
 import os
+import queue
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-import sqlite3
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
 
 try:
     from fastmcp import FastMCP
 except ImportError:
     from mcp.server.fastmcp import FastMCP
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from _common import dumps  # noqa: E402
 
-DB_PATH = Path(__file__).resolve().parent / "jewelryops.db"
 
+DB_PATH = Path(__file__).resolve().parent / "jewelryops.db"
 
-def _get_conn() -> sqlite3.Connection:
-    """Create a new SQLite connection."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+# Set JEWELRYOPS_DB_IN_MEMORY=1 to host the mock data in a shared in-memory
+# database instead of DB_PATH: no disk I/O at all, but notes written by
+# add_note are lost when the server exits.
+_IN_MEMORY = os.environ.get("JEWELRYOPS_DB_IN_MEMORY", "").lower() in ("1", "true", "yes")
+_MEMORY_URI = "file:jewelryops?mode=memory&cache=shared"
+
+
+_POOL_SIZE = 8
+# Prepared statements kept per connection; comfortably above the number of
+# distinct queries below, so none is ever recompiled.
+_STATEMENT_CACHE_SIZE = 256
+# LIFO so the most recently used (warmest) connection is handed out first.
+_POOL: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=_POOL_SIZE)
+
+
+# Applied to every new connection: WAL lets readers run alongside add_note,
+# and the cache/mmap sizes comfortably hold the whole mock dataset.
+_CONNECTION_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA cache_size=-65536;
+PRAGMA foreign_keys=ON;
+"""
+
+
+def _connect() -> sqlite3.Connection:
+    """Create a new SQLite connection with performance pragmas applied.
+
+    Rows come back as plain tuples; callers that need objects zip them with
+    the column names from cursor.description. Connections run in autocommit
+    mode, so writers open their own BEGIN IMMEDIATE transaction.
+    """
+    if _IN_MEMORY:
+        conn = sqlite3.connect(
+            _MEMORY_URI,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=_STATEMENT_CACHE_SIZE,
+            isolation_level=None,
+        )
+    else:
+        conn = sqlite3.connect(
+            DB_PATH,
+            check_same_thread=False,
+            cached_statements=_STATEMENT_CACHE_SIZE,
+            isolation_level=None,
+        )
+    conn.executescript(_CONNECTION_PRAGMAS)
     return conn
 
 
-def _init_schema_and_data() -> None:
-    """Create tables if needed and insert mock data when empty."""
-    conn = _get_conn()
-    cur = conn.cursor()
+@contextmanager
+def _conn() -> Iterator[sqlite3.Connection]:
+    """Borrow a pooled SQLite connection, opening one if the pool is empty."""
     try:
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS customers (
-              id TEXT PRIMARY KEY,
-              name TEXT NOT NULL,
-              email TEXT NOT NULL,
-              phone TEXT NULL
-            )
-            """
-        )
-
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS orders (
-              id TEXT PRIMARY KEY,
-              customer_id TEXT NOT NULL,
-              sku TEXT NOT NULL,
-              status TEXT NOT NULL,
-              placed_at TEXT NOT NULL,
-              expected_delivery TEXT NULL,
-              total_amount REAL NOT NULL
-            )
-            """
-        )
+        conn = _POOL.get_nowait()
+    except queue.Empty:
+        conn = _connect()
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            _POOL.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+def _close_pool() -> None:
+    """Close all idle pooled connections."""
+    while True:
+        try:
+            _POOL.get_nowait().close()
+        except queue.Empty:
+            return
+
+
+atexit.register(_close_pool)
+
+# Kept outside the pool and never used for writes, so its PRAGMA data_version
+# changes whenever any other connection commits: add_note, another server
+# process or init_db.py. It also keeps a shared in-memory database alive
+# after the pool closes idle connections.
+_VERSION_CONN = _connect()
+_VERSION_LOCK = threading.Lock()
+
+
+def _data_version() -> int:
+    """Return a counter that changes after every commit made elsewhere."""
+    with _VERSION_LOCK:
+        return _VERSION_CONN.execute("PRAGMA data_version").fetchone()[0]
+
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS customers (
+  id TEXT PRIMARY KEY,
+  name TEXT NOT NULL,
+  email TEXT NOT NULL,
+  phone TEXT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS orders (
+  id TEXT PRIMARY KEY,
+  customer_id TEXT NOT NULL,
+  sku TEXT NOT NULL,
+  status TEXT NOT NULL,
+  placed_at TEXT NOT NULL,
+  expected_delivery TEXT NULL,
+  total_amount REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS inventory (
+  sku TEXT PRIMARY KEY,
+  name TEXT NOT NULL,
+  quantity INTEGER NOT NULL,
+  reserved INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS notes (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  entity_type TEXT NOT NULL,
+  entity_id TEXT NOT NULL,
+  author TEXT NOT NULL,
+  body TEXT NOT NULL,
+  created_at TEXT NOT NULL
+);
+
+-- Serve list_orders (status filter + placed_at sort) and get_notes
+-- straight from index range scans.
+CREATE INDEX IF NOT EXISTS idx_orders_status_placed ON orders(status, placed_at DESC);
+CREATE INDEX IF NOT EXISTS idx_orders_customer ON orders(customer_id);
+CREATE INDEX IF NOT EXISTS idx_notes_entity ON notes(entity_type, entity_id, created_at);
+
+-- Trigram index over name and email so search_customers' substring match
+-- is served by FTS5 instead of a LOWER() scan of customers.
+CREATE VIRTUAL TABLE IF NOT EXISTS customers_fts
+USING fts5(id UNINDEXED, haystack, tokenize='trigram');
+"""
+
+_SQL_FILL_CUSTOMERS_FTS = """
+INSERT INTO customers_fts (id, haystack)
+SELECT id, name || char(10) || email FROM customers
+"""
+
+
+# Tool queries, kept as module constants so every call sends identical SQL
+# text and hits the connection's prepared statement cache. Column lists are
+# spelled out rather than SELECT *.
+_SQL_GET_CUSTOMER = "SELECT id, name, email, phone FROM customers WHERE id = ?"
+_SQL_LIST_CUSTOMERS = "SELECT id, name, email, phone FROM customers ORDER BY id LIMIT ?"
+_SQL_SEARCH_CUSTOMERS = """
+SELECT c.id, c.name, c.email, c.phone
+FROM customers_fts f
+JOIN customers c ON c.id = f.id
+WHERE f.haystack LIKE ?
+ORDER BY c.id
+"""
+_SQL_GET_ORDER = """
+SELECT id, customer_id, sku, status, placed_at, expected_delivery, total_amount
+FROM orders WHERE id = ?
+"""
+_SQL_LIST_ORDERS = """
+SELECT id, customer_id, sku, status, placed_at, expected_delivery, total_amount
+FROM orders ORDER BY placed_at DESC LIMIT ?
+"""
+_SQL_LIST_ORDERS_BY_STATUS = """
+SELECT id, customer_id, sku, status, placed_at, expected_delivery, total_amount
+FROM orders WHERE status = ? ORDER BY placed_at DESC LIMIT ?
+"""
+_SQL_GET_INVENTORY_ITEM = "SELECT sku, name, quantity, reserved FROM inventory WHERE sku = ?"
+_SQL_LIST_INVENTORY = "SELECT sku, name, quantity, reserved FROM inventory ORDER BY sku LIMIT ?"
+_SQL_GET_STOCK = "SELECT quantity, reserved FROM inventory WHERE sku = ?"
+_SQL_GET_NOTES = """
+SELECT id, entity_type, entity_id, author, body, created_at
+FROM notes
+WHERE entity_type = ? AND entity_id = ?
+ORDER BY created_at
+"""
+_SQL_INSERT_NOTE = """
+INSERT INTO notes (entity_type, entity_id, author, body, created_at)
+VALUES (?, ?, ?, ?, ?)
+"""
+
+
+# Mock customers, inventory, orders and notes as literal multi-row INSERTs:
+# SQLite parses each once, with no per-row parameter binding from Python.
+_SEED_STATEMENTS = (
+    """
+    INSERT INTO customers (id, name, email, phone) VALUES
+      ('cust_001', 'Lisa Park', 'lisa.park@example.com', '+1-555-0101'),
+      ('cust_002', 'Daniel Kim', 'daniel.kim@example.com', '+1-555-0102'),
+      ('cust_003', 'Amelia Stone', 'amelia.stone@example.com', '+1-555-0103'),
+      ('cust_004', 'Marcus Rivera', 'marcus.rivera@example.com', '+1-555-0104'),
+      ('cust_005', 'Sarah Chen', 'sarah.chen@example.com', '+1-555-0105')
+    """,
+    """
+    INSERT INTO inventory (sku, name, quantity, reserved) VALUES
+      ('RING-101', '18K Rose Gold Engagement Ring', 8, 3),
+      ('RING-102', 'Platinum Solitaire Diamond Ring', 2, 2),
+      ('BRAC-301', 'Platinum Tennis Bracelet', 4, 2),
+      ('BRAC-302', '18K White Gold Diamond Bracelet', 0, 0),
+      ('NECK-210', 'White Gold Diamond Necklace', 2, 1),
+      ('NECK-211', 'Rose Gold Pearl Pendant', 6, 0),
+      ('EARR-401', 'Diamond Stud Earrings 2ct', 5, 1)
+    """,
+    """
+    INSERT INTO orders (id, customer_id, sku, status, placed_at, expected_delivery, total_amount) VALUES
+      ('ORD-2038', 'cust_001', 'RING-101', 'shipped', '2025-02-01 10:00:00+00:00', '2025-02-05 12:00:00+00:00', 2499.00),
+      ('ORD-2041', 'cust_002', 'BRAC-301', 'delivered', '2025-02-01 08:00:00+00:00', '2025-02-04 12:00:00+00:00', 3299.00),
+      ('ORD-2050', 'cust_003', 'NECK-210', 'processing', '2025-02-07 14:00:00+00:00', '2025-02-12 12:00:00+00:00', 4599.00),
+      ('ORD-2035', 'cust_004', 'BRAC-302', 'returned', '2025-02-25 09:00:00+00:00', '2025-02-28 12:00:00+00:00', 5299.00),
+      ('ORD-2055', 'cust_005', 'RING-102', 'processing', '2025-02-08 11:00:00+00:00', '2025-02-15 12:00:00+00:00', 8999.00),
+      ('ORD-2052', 'cust_001', 'EARR-401', 'processing', '2025-02-06 15:00:00+00:00', '2025-02-11 12:00:00+00:00', 1899.00)
+    """,
+    """
+    INSERT INTO notes (entity_type, entity_id, author, body, created_at) VALUES
+      ('order', 'ORD-2038', 'Support', 'Customer (Lisa Park) reported order is 4 days late. Carrier tracking shows package delayed at distribution center.', '2025-02-09 12:00:00+00:00'),
+      ('customer', 'cust_001', 'Support', 'High-value customer, repeat buyer. Prefers concise email communication. Previous issue: 2025-01-15 late shipment resolved with $200 credit.', '2025-02-09 12:00:00+00:00'),
+      ('order', 'ORD-2035', 'Support', 'Customer returned bracelet due to sizing issue. Return received 2025-02-08. Refund authorization pending.', '2025-02-09 12:00:00+00:00'),
+      ('customer', 'cust_004', 'Support', 'First-time customer, high-value purchase ($5,299). Return within 14 days for full refund per policy. No prior complaints.', '2025-02-09 12:00:00+00:00'),
+      ('inventory', 'BRAC-302', 'Ops', 'Out of stock. 2 units ordered from supplier on 2025-02-05, ETA 2025-02-20. 1 unit reserved for return processing.', '2025-02-09 12:00:00+00:00'),
+      ('inventory', 'RING-102', 'Ops', 'Low stock (2 units). Both units reserved: 1 for ORD-2055, 1 hold for quality check. Next shipment ETA 2025-02-28.', '2025-02-09 12:00:00+00:00'),
+      ('order', 'ORD-2052', 'Support', 'Earrings in high demand. Currently low stock (5 total, 1 reserved). Customer notified of 3-5 day processing delay.', '2025-02-09 12:00:00+00:00')
+    """,
+)
+
+
+# Stored in PRAGMA user_version once the schema, seed and search index are
+# in place; bump it when _SCHEMA_SQL changes so existing databases upgrade.
+_SCHEMA_VERSION = 1
 
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS inventory (
-              sku TEXT PRIMARY KEY,
-              name TEXT NOT NULL,
-              quantity INTEGER NOT NULL,
-              reserved INTEGER NOT NULL DEFAULT 0
-            )
-            """
-        )
 
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS notes (
-              id INTEGER PRIMARY KEY AUTOINCREMENT,
-              entity_type TEXT NOT NULL,
-              entity_id TEXT NOT NULL,
-              author TEXT NOT NULL,
-              body TEXT NOT NULL,
-              created_at TEXT NOT NULL
-            )
-            """
-        )
+def _init_schema_and_data() -> None:
+    """Create tables if needed and insert mock data when empty."""
+    with _conn() as conn:
+        (version,) = conn.execute("PRAGMA user_version").fetchone()
+        if version >= _SCHEMA_VERSION:
+            return
+        conn.executescript(_SCHEMA_SQL)
 
+        cur = conn.cursor()
+        # One write transaction for the whole seed, taken up front so the
+        # count check and the inserts cannot race another starting server.
+        cur.execute("BEGIN IMMEDIATE")
         cur.execute("SELECT COUNT(*) AS c FROM customers")
         row = cur.fetchone()
         count = row[0] if row else 0
         if count == 0:
-            _insert_mock_data(cur)
-        conn.commit()
-    finally:
-        cur.close()
-        conn.close()
-
-
-def _insert_mock_data(cur) -> None:
-    """Insert a realistic set of mock customers, orders, inventory, and notes."""
-    customers = [
-        ("cust_001", "Lisa Park", "lisa.park@example.com", "+1-555-0101"),
-        ("cust_002", "Daniel Kim", "daniel.kim@example.com", "+1-555-0102"),
-        ("cust_003", "Amelia Stone", "amelia.stone@example.com", "+1-555-0103"),
-        ("cust_004", "Marcus Rivera", "marcus.rivera@example.com", "+1-555-0104"),
-        ("cust_005", "Sarah Chen", "sarah.chen@example.com", "+1-555-0105"),
-    ]
-    cur.executemany(
-        "INSERT INTO customers (id, name, email, phone) VALUES (?, ?, ?, ?)",
-        customers,
-    )
+            for statement in _SEED_STATEMENTS:
+                cur.execute(statement)
+        cur.execute("SELECT 1 FROM customers_fts LIMIT 1")
+        if cur.fetchone() is None:
+            # Also backfills databases created before the search index existed.
+            cur.execute(_SQL_FILL_CUSTOMERS_FTS)
+        cur.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        cur.execute("COMMIT")
+        if count == 0:
+            # Collect statistics once so the planner picks the indexes above.
+            cur.execute("ANALYZE")
 
-    inventory = [
-        ("RING-101", "18K Rose Gold Engagement Ring", 8, 3),
-        ("RING-102", "Platinum Solitaire Diamond Ring", 2, 2),
-        ("BRAC-301", "Platinum Tennis Bracelet", 4, 2),
-        ("BRAC-302", "18K White Gold Diamond Bracelet", 0, 0),
-        ("NECK-210", "White Gold Diamond Necklace", 2, 1),
-        ("NECK-211", "Rose Gold Pearl Pendant", 6, 0),
-        ("EARR-401", "Diamond Stud Earrings 2ct", 5, 1),
-    ]
-    cur.executemany(
-        "INSERT INTO inventory (sku, name, quantity, reserved) VALUES (?, ?, ?, ?)",
-        inventory,
-    )
 
-    now = datetime(2025, 2, 9, 12, 0, 0, tzinfo=timezone.utc)
-    orders = [
-        (
-            "ORD-2038",
-            "cust_001",
-            "RING-101",
-            "shipped",
-            now.replace(day=1, hour=10),
-            now.replace(day=5),
-            2499.00,
-        ),
-        (
-            "ORD-2041",
-            "cust_002",
-            "BRAC-301",
-            "delivered",
-            now.replace(day=1, hour=8),
-            now.replace(day=4),
-            3299.00,
-        ),
-        (
-            "ORD-2050",
-            "cust_003",
-            "NECK-210",
-            "processing",
-            now.replace(day=7, hour=14),
-            now.replace(day=12),
-            4599.00,
-        ),
-        (
-            "ORD-2035",
-            "cust_004",
-            "BRAC-302",
-            "returned",
-            now.replace(day=25, hour=9),
-            now.replace(day=30),
-            5299.00,
-        ),
-        (
-            "ORD-2055",
-            "cust_005",
-            "RING-102",
-            "processing",
-            now.replace(day=8, hour=11),
-            now.replace(day=15),
-            8999.00,
-        ),
-        (
-            "ORD-2052",
-            "cust_001",
-            "EARR-401",
-            "processing",
-            now.replace(day=6, hour=15),
-            now.replace(day=11),
-            1899.00,
-        ),
-    ]
-    cur.executemany(
-        """
-        INSERT INTO orders
-          (id, customer_id, sku, status, placed_at, expected_delivery, total_amount)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        """,
-        orders,
-    )
+_init_schema_and_data()
 
-    created = now.isoformat(sep=" ", timespec="seconds")
-    notes = [
-        (
-            "order",
-            "ORD-2038",
-            "Support",
-            "Customer (Lisa Park) reported order is 4 days late. Carrier tracking shows package delayed at distribution center.",
-            created,
-        ),
-        (
-            "customer",
-            "cust_001",
-            "Support",
-            "High-value customer, repeat buyer. Prefers concise email communication. Previous issue: 2025-01-15 late shipment resolved with $200 credit.",
-            created,
-        ),
-        (
-            "order",
-            "ORD-2035",
-            "Support",
-            "Customer returned bracelet due to sizing issue. Return received 2025-02-08. Refund authorization pending.",
-            created,
-        ),
-        (
-            "customer",
-            "cust_004",
-            "Support",
-            "First-time customer, high-value purchase ($5,299). Return within 14 days for full refund per policy. No prior complaints.",
-            created,
-        ),
-        (
-            "inventory",
-            "BRAC-302",
-            "Ops",
-            "Out of stock. 2 units ordered from supplier on 2025-02-05, ETA 2025-02-20. 1 unit reserved for return processing.",
-            created,
-        ),
-        (
-            "inventory",
-            "RING-102",
-            "Ops",
-            "Low stock (2 units). Both units reserved: 1 for ORD-2055, 1 hold for quality check. Next shipment ETA 2025-02-28.",
-            created,
-        ),
-        (
-            "order",
-            "ORD-2052",
-            "Support",
-            "Earrings in high demand. Currently low stock (5 total, 1 reserved). Customer notified of 3-5 day processing delay.",
-            created,
-        ),
-    ]
-    cur.executemany(
-        """
-        INSERT INTO notes (entity_type, entity_id, author, body, created_at)
-        VALUES (?, ?, ?, ?, ?)
-        """,
-        notes,
-    )
 
+def _dumps(obj: Any) -> str:
+    """Serialize a tool result to indented JSON, stringifying non-JSON values."""
+    return dumps(obj, default=str)
 
-_init_schema_and_data()
+
+def _columns(cur: sqlite3.Cursor) -> list[str]:
+    """Return the column names of an executed cursor."""
+    return [d[0] for d in cur.description]
+
+
+def _query_json(conn: sqlite3.Connection, sql: str, params: tuple[Any, ...] = ()) -> str:
+    """Run a query and serialize its rows as a JSON array of objects.
+
+    Rows are zipped with the column names straight off the cursor, skipping
+    the intermediate fetchall() list.
+    """
+    cur = conn.execute(sql, params)
+    cols = _columns(cur)
+    return _dumps([dict(zip(cols, row)) for row in cur])
+
+
+# Full-listing JSON for the list tools, keyed by table:
+# (data version, row count, json). Rebuilt when the database has changed.
+_STATIC_JSON: dict[str, tuple[int, int, str]] = {}
+_STATIC_SQL = {
+    "customers": _SQL_LIST_CUSTOMERS,
+    "orders": _SQL_LIST_ORDERS,
+    "inventory": _SQL_LIST_INVENTORY,
+}
+
+
+def _static_json(key: str) -> tuple[int, str]:
+    """Return (row count, full listing JSON) for a table, serializing it on change."""
+    version = _data_version()
+    cached = _STATIC_JSON.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1], cached[2]
+    with _conn() as conn:
+        total = conn.execute(f"SELECT COUNT(*) FROM {key}").fetchone()[0]
+        # LIMIT -1 means no limit in SQLite.
+        full_json = _query_json(conn, _STATIC_SQL[key], (-1,))
+    _STATIC_JSON[key] = (version, total, full_json)
+    return total, full_json
+
+
+def _build_static_json() -> None:
+    """Serialize the full customers, orders and inventory listings up front."""
+    for key in _STATIC_SQL:
+        _static_json(key)
+
+
+_build_static_json()
 
 mcp = FastMCP("JewelryOps SQLite", json_response=True)
 
+_T = TypeVar("_T")
+
+
+def _in_thread(fn: Callable[..., _T]) -> Callable[..., Awaitable[_T]]:
+    """Turn a blocking tool into a coroutine that runs it on a worker thread.
+
+    sqlite3 calls block, so running them on the event loop would serialize
+    every tool call behind the slowest query. The pooled connections are
+    opened with check_same_thread=False, so any worker may borrow one.
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> _T:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    return wrapper
+
+
+# Read-through caches for the hot lookup tools, keyed on _data_version() so
+# a commit from any connection or process misses; add_note also clears them.
+@lru_cache(maxsize=256)
+def _row_json_cached(version: int, sql: str, params: tuple[Any, ...]) -> str | None:
+    """Run a single-row query and return the row as JSON, or None if missing.
+
+    ``version`` is unused in the body; it only makes the cache key stale
+    once the database changes.
+    """
+    with _conn() as conn:
+        cur = conn.execute(sql, params)
+        row = cur.fetchone()
+        if row is None:
+            return None
+        return _dumps(dict(zip(_columns(cur), row)))
+
+
+@lru_cache(maxsize=256)
+def _rows_json_cached(version: int, sql: str, params: tuple[Any, ...]) -> str:
+    """Run a multi-row query and return the rows as a JSON array."""
+    with _conn() as conn:
+        return _query_json(conn, sql, params)
+
+
+@lru_cache(maxsize=256)
+def _stock_cached(version: int, sku: str) -> tuple[int, int] | None:
+    """Return (quantity, reserved) for a SKU, or None if missing."""
+    with _conn() as conn:
+        row = conn.execute(_SQL_GET_STOCK, (sku,)).fetchone()
+    if row is None:
+        return None
+    quantity, reserved = row
+    return int(quantity), int(reserved or 0)
+
+
+def _clear_read_caches() -> None:
+    """Invalidate all cached read results after a write."""
+    _row_json_cached.cache_clear()
+    _rows_json_cached.cache_clear()
+    _stock_cached.cache_clear()
+
 
 
 
 @mcp.tool()
+@_in_thread
 def get_customer(customer_id: str) -> str:
     """Get a single customer by ID (e.g. cust_001)."""
-    conn = _get_conn()
-    try:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM customers WHERE id = ?", (customer_id,))
-        row = cur.fetchone()
-        if not row:
-            return json.dumps({"error": f"Customer not found: {customer_id}"}, indent=2)
-        return json.dumps(dict(row), indent=2, default=str)
-    finally:
-        conn.close()
+    row_json = _row_json_cached(_data_version(), _SQL_GET_CUSTOMER, (customer_id,))
+    if row_json is None:
+        return _dumps({"error": f"Customer not found: {customer_id}"})
+    return row_json
 
 
 @mcp.tool()
+@_in_thread
 def list_customers(limit: int = 20) -> str:
     """List customers, limited by count."""
-    conn = _get_conn()
-    try:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM customers ORDER BY id LIMIT ?", (limit,))
-        rows = [dict(r) for r in cur.fetchall()]
-        return json.dumps(rows, indent=2, default=str)
-    finally:
-        conn.close()
+    total, full_json = _static_json("customers")
+    if limit >= total:
+        return full_json
+    with _conn() as conn:
+        return _query_json(conn, _SQL_LIST_CUSTOMERS, (limit,))
 
 
 @mcp.tool()
+@_in_thread
 def search_customers(query: str) -> str:
     """Search customers by name or email (case-insensitive partial match)."""
     like = f"%{query.lower()}%"
-    conn = _get_conn()
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT * FROM customers
-            WHERE LOWER(name) LIKE ? OR LOWER(email) LIKE ?
-            ORDER BY id
-            """,
-            (like, like),
-        )
-        rows = [dict(r) for r in cur.fetchall()]
-        return json.dumps(rows, indent=2, default=str)
-    finally:
-        conn.close()
+    with _conn() as conn:
+        return _query_json(conn, _SQL_SEARCH_CUSTOMERS, (like,))
 
 
 
 
 @mcp.tool()
+@_in_thread
 def get_order(order_id: str) -> str:
     """Get a single order by ID (e.g. ORD-2038)."""
-    conn = _get_conn()
-    try:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM orders WHERE id = ?", (order_id,))
-        row = cur.fetchone()
-        if not row:
-            return json.dumps({"error": f"Order not found: {order_id}"}, indent=2)
-        return json.dumps(dict(row), indent=2, default=str)
-    finally:
-        conn.close()
+    row_json = _row_json_cached(_data_version(), _SQL_GET_ORDER, (order_id,))
+    if row_json is None:
+        return _dumps({"error": f"Order not found: {order_id}"})
+    return row_json
 
 
 @mcp.tool()
+@_in_thread
 def list_orders(status: str = "", limit: int = 20) -> str:
     """List orders, optionally filtered by status (pending, processing, shipped, delivered, cancelled)."""
-    conn = _get_conn()
-    try:
-        cur = conn.cursor()
+    if not status:
+        total, full_json = _static_json("orders")
+        if limit >= total:
+            return full_json
+    with _conn() as conn:
         if status:
-            cur.execute(
-                "SELECT * FROM orders WHERE status = ? ORDER BY placed_at DESC LIMIT ?",
-                (status.lower(), limit),
+            return _query_json(
+                conn, _SQL_LIST_ORDERS_BY_STATUS, (status.lower(), limit)
             )
-        else:
-            cur.execute(
-                "SELECT * FROM orders ORDER BY placed_at DESC LIMIT ?", (limit,)
-            )
-        rows = [dict(r) for r in cur.fetchall()]
-        return json.dumps(rows, indent=2, default=str)
-    finally:
-        conn.close()
+        return _query_json(conn, _SQL_LIST_ORDERS, (limit,))
 
 
 @mcp.tool()
+@_in_thread
 def get_inventory_item(sku: str) -> str:
     """Get inventory for a single SKU (e.g. RING-101, BRAC-301)."""
-    conn = _get_conn()
-    try:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM inventory WHERE sku = ?", (sku,))
-        row = cur.fetchone()
-        if not row:
-            return json.dumps({"error": f"SKU not found: {sku}"}, indent=2)
-        return json.dumps(dict(row), indent=2, default=str)
-    finally:
-        conn.close()
+    row_json = _row_json_cached(_data_version(), _SQL_GET_INVENTORY_ITEM, (sku,))
+    if row_json is None:
+        return _dumps({"error": f"SKU not found: {sku}"})
+    return row_json
 
 
 @mcp.tool()
+@_in_thread
 def list_inventory(limit: int = 50) -> str:
     """List all inventory items with quantity and reserved counts."""
-    conn = _get_conn()
-    try:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM inventory ORDER BY sku LIMIT ?", (limit,))
-        rows = [dict(r) for r in cur.fetchall()]
-        return json.dumps(rows, indent=2, default=str)
-    finally:
-        conn.close()
+    total, full_json = _static_json("inventory")
+    if limit >= total:
+        return full_json
+    with _conn() as conn:
+        return _query_json(conn, _SQL_LIST_INVENTORY, (limit,))
 
 
 @mcp.tool()
+@_in_thread
 def check_stock(sku: str, quantity: int = 1) -> str:
     """Check if a SKU has at least the given quantity available (quantity - reserved)."""
-    conn = _get_conn()
-    try:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM inventory WHERE sku = ?", (sku,))
-        row = cur.fetchone()
-        if not row:
-            return json.dumps({"error": f"SKU not found: {sku}"}, indent=2)
-
-        row_d = dict(row)
-        available = int(row_d["quantity"]) - int(row_d.get("reserved", 0))
-        ok = available >= quantity
-        return json.dumps(
-            {
-                "sku": sku,
-                "available": available,
-                "requested": quantity,
-                "in_stock": ok,
-            },
-            indent=2,
-        )
-    finally:
-        conn.close()
+    stock = _stock_cached(_data_version(), sku)
+    if stock is None:
+        return _dumps({"error": f"SKU not found: {sku}"})
+
+    available = stock[0] - stock[1]
+    ok = available >= quantity
+    return _dumps(
+        {
+            "sku": sku,
+            "available": available,
+            "requested": quantity,
+            "in_stock": ok,
+        },
+    )
 
 
 
 
 @mcp.tool()
+@_in_thread
 def get_notes(entity_type: str, entity_id: str) -> str:
     """Get all internal notes for an entity (order, customer, or inventory)."""
-    conn = _get_conn()
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT id, entity_type, entity_id, author, body, created_at
-            FROM notes
-            WHERE entity_type = ? AND entity_id = ?
-            ORDER BY created_at
-            """,
-            (entity_type, entity_id),
-        )
-        rows = [dict(r) for r in cur.fetchall()]
-        return json.dumps(rows, indent=2, default=str)
-    finally:
-        conn.close()
+    return _rows_json_cached(_data_version(), _SQL_GET_NOTES, (entity_type, entity_id))
 
 
 @mcp.tool()
+@_in_thread
 def add_note(entity_type: str, entity_id: str, body: str, author: str = "Agent") -> str:
     """Add an internal note to an entity (order, customer, or inventory). Has side effects: persists the note."""
-    now = datetime.now(timezone.utc)
-    conn = _get_conn()
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO notes (entity_type, entity_id, author, body, created_at)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (entity_type, entity_id, author, body, now.isoformat()),
+    created_at = datetime.now(timezone.utc).isoformat(sep=" ")
+    with _conn() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        cur = conn.execute(
+            _SQL_INSERT_NOTE, (entity_type, entity_id, author, body, created_at)
         )
-        note_id = cur.lastrowid
-        conn.commit()
-        cur.execute(
-            """
-            SELECT id, entity_type, entity_id, author, body, created_at
-            FROM notes WHERE id = ?
-            """,
-            (note_id,),
-        )
-        row = cur.fetchone()
-        return json.dumps({"ok": True, "note": dict(row)}, indent=2, default=str)
-    finally:
-        conn.close()
+        conn.execute("COMMIT")
+    _clear_read_caches()
+    note = {
+        "id": cur.lastrowid,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "author": author,
+        "body": body,
+        "created_at": created_at,
+    }
+    return _dumps({"ok": True, "note": note})
 
 
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-import json
+import sys
 from pathlib import Path
 from typing import List, Dict, Any
 
@@ -7,22 +7,39 @@ try:
 except ImportError:
     from mcp.server.fastmcp import FastMCP
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from _common import MtimeCache, dumps as _dumps  # noqa: E402
+
 
 _DATA_DIR = Path(__file__).resolve().parent / "data"
 _DATA_DIR.mkdir(parents=True, exist_ok=True)
 _ISSUES_PATH = _DATA_DIR / "issues.json"
 
 
+def _index_issues(
+    issues: List[Dict[str, Any]],
+) -> tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    return issues, {i["id"]: i for i in reversed(issues)}
+
+
+# Parsed issues.json as (issues, issues_by_id), reloaded when the file changes.
+_ISSUES = MtimeCache(_ISSUES_PATH, _index_issues)
+
+
+def _load_issues_entry() -> tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    # The cache's mtime stat doubles as the existence check.
+    try:
+        return _ISSUES.get()
+    except FileNotFoundError:
+        return _ISSUES.save([])
+
+
 def _load_issues() -> List[Dict[str, Any]]:
-    if not _ISSUES_PATH.exists():
-        _ISSUES_PATH.write_text("[]", encoding="utf-8")
-    with open(_ISSUES_PATH, encoding="utf-8") as f:
-        return json.load(f)
+    return _load_issues_entry()[0]
 
 
 def _save_issues(issues: List[Dict[str, Any]]) -> None:
-    with open(_ISSUES_PATH, "w", encoding="utf-8") as f:
-        json.dump(issues, f, indent=2)
+    _ISSUES.save(issues)
 
 
 def _ensure_seed_data() -> None:
@@ -49,17 +66,17 @@ def _ensure_seed_data() -> None:
 
 _ensure_seed_data()
 
+
 mcp = FastMCP("Notion Mock (Issues)", json_response=True)
 
 
 @mcp.tool()
 def get_issue(issue_id: str) -> str:
     """Get a single issue by ID (e.g. ISSUE-1)."""
-    issues = _load_issues()
-    for issue in issues:
-        if issue["id"] == issue_id:
-            return json.dumps(issue, indent=2)
-    return json.dumps({"error": f"Issue not found: {issue_id}"}, indent=2)
+    issue = _load_issues_entry()[1].get(issue_id)
+    if issue is not None:
+        return _dumps(issue)
+    return _dumps({"error": f"Issue not found: {issue_id}"})
 
 
 @mcp.tool()
@@ -68,7 +85,7 @@ def list_issues(status: str = "", limit: int = 20) -> str:
     issues = _load_issues()
     if status:
         issues = [i for i in issues if i.get("status") == status]
-    return json.dumps(issues[:limit], indent=2)
+    return _dumps(issues[:limit])
 
 
 @mcp.tool()
@@ -82,9 +99,9 @@ def create_issue(title: str, priority: str = "medium") -> str:
         "status": "open",
         "priority": priority,
     }
-    issues.append(issue)
-    _save_issues(issues)
-    return json.dumps({"ok": True, "issue": issue}, indent=2)
+    # A new list, so the cached one only changes through _save_issues.
+    _save_issues([*issues, issue])
+    return _dumps({"ok": True, "issue": issue})
 
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 """JewelryOps Orders & Inventory MCP server."""
 
-import json
+import sys
+from collections import defaultdict
 from pathlib import Path
 
 try:
@@ -8,19 +9,51 @@ try:
 except ImportError:
     from mcp.server.fastmcp import FastMCP
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from _common import MtimeCache, dumps as _dumps  # noqa: E402
+
 _DATA_DIR = Path(__file__).resolve().parent / "data"
 _ORDERS_PATH = _DATA_DIR / "orders.json"
 _INVENTORY_PATH = _DATA_DIR / "inventory.json"
 
 
+def _index_orders(
+    data: list[dict],
+) -> tuple[list[dict], dict[str, dict], dict[str, list[dict]]]:
+    by_id = {row["id"]: row for row in reversed(data)}  # first match wins, as in a scan
+    by_status: dict[str, list[dict]] = defaultdict(list)
+    for row in data:
+        by_status[row["status"]].append(row)
+    return data, by_id, dict(by_status)
+
+
+def _index_inventory(data: list[dict]) -> tuple[list[dict], dict[str, dict]]:
+    return data, {row["sku"]: row for row in reversed(data)}
+
+
+# Parsed data files with their lookup indexes, reloaded when the file changes.
+_ORDERS = MtimeCache(_ORDERS_PATH, _index_orders)
+_INVENTORY = MtimeCache(_INVENTORY_PATH, _index_inventory)
+
+
 def _load_orders() -> list[dict]:
-    with open(_ORDERS_PATH, encoding="utf-8") as f:
-        return json.load(f)
+    return _ORDERS.get()[0]
+
+
+def _orders_by_id() -> dict[str, dict]:
+    return _ORDERS.get()[1]
+
+
+def _orders_by_status() -> dict[str, list[dict]]:
+    return _ORDERS.get()[2]
 
 
 def _load_inventory() -> list[dict]:
-    with open(_INVENTORY_PATH, encoding="utf-8") as f:
-        return json.load(f)
+    return _INVENTORY.get()[0]
+
+
+def _inventory_by_sku() -> dict[str, dict]:
+    return _INVENTORY.get()[1]
 
 
 mcp = FastMCP("JewelryOps Orders & Inventory", json_response=True)
@@ -29,11 +62,10 @@ mcp = FastMCP("JewelryOps Orders & Inventory", json_response=True)
 @mcp.tool()
 def get_order(order_id: str) -> str:
     """Get a single order by ID (e.g. ORD-2038, ORD-2041)."""
-    orders = _load_orders()
-    for o in orders:
-        if o["id"] == order_id:
-            return json.dumps(o, indent=2)
-    return json.dumps({"error": f"Order not found: {order_id}"})
+    o = _orders_by_id().get(order_id)
+    if o is not None:
+        return _dumps(o)
+    return _dumps({"error": f"Order not found: {order_id}"})
 
 
 @mcp.tool()
@@ -44,47 +76,45 @@ def list_orders(status: str = "", limit: int = 20) -> str:
     optional/union types in the schema so that MCP → function-calling
     adapters (like OpenAI tools) see a simple string parameter.
     """
-    orders = _load_orders()
     if status:
-        orders = [o for o in orders if o["status"] == status.lower()]
-    return json.dumps(orders[:limit], indent=2)
+        orders = _orders_by_status().get(status.lower(), [])
+    else:
+        orders = _load_orders()
+    return _dumps(orders[:limit])
 
 
 @mcp.tool()
 def get_inventory_item(sku: str) -> str:
     """Get inventory for a single SKU (e.g. RING-101, BRAC-301)."""
-    inv = _load_inventory()
-    for item in inv:
-        if item["sku"] == sku:
-            return json.dumps(item, indent=2)
-    return json.dumps({"error": f"SKU not found: {sku}"})
+    item = _inventory_by_sku().get(sku)
+    if item is not None:
+        return _dumps(item)
+    return _dumps({"error": f"SKU not found: {sku}"})
 
 
 @mcp.tool()
 def list_inventory(limit: int = 50) -> str:
     """List all inventory items with quantity and reserved counts."""
     inv = _load_inventory()
-    return json.dumps(inv[:limit], indent=2)
+    return _dumps(inv[:limit])
 
 
 @mcp.tool()
 def check_stock(sku: str, quantity: int = 1) -> str:
     """Check if a SKU has at least the given quantity available (quantity - reserved)."""
-    inv = _load_inventory()
-    for item in inv:
-        if item["sku"] == sku:
-            available = item["quantity"] - item.get("reserved", 0)
-            ok = available >= quantity
-            return json.dumps(
-                {
-                    "sku": sku,
-                    "available": available,
-                    "requested": quantity,
-                    "in_stock": ok,
-                },
-                indent=2,
-            )
-    return json.dumps({"error": f"SKU not found: {sku}"})
+    item = _inventory_by_sku().get(sku)
+    if item is None:
+        return _dumps({"error": f"SKU not found: {sku}"})
+    available = item["quantity"] - item.get("reserved", 0)
+    ok = available >= quantity
+    return _dumps(
+        {
+            "sku": sku,
+            "available": available,
+            "requested": quantity,
+            "in_stock": ok,
+        },
+    )
 
 
 if __name__ == "__main__":
@@ -9,16 +9,20 @@ separate modules.
 
 from .agent import (
     JewelryOpsAgentService,
+    close_mcp_sessions,
     get_mcp_tools,
     get_mcp_tools_async,
     get_session,
     run_agent_stream,
 )
+from .tools import close_tool_clients
 from ..models import SessionState
 
 __all__ = [
     "JewelryOpsAgentService",
     "SessionState",
+    "close_mcp_sessions",
+    "close_tool_clients",
     "get_mcp_tools",
     "get_mcp_tools_async",
     "get_session",
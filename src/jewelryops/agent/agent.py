@@ -1,30 +1,57 @@
+import asyncio
+import inspect
 import json
 import logging
 import os
+from collections import OrderedDict
+from contextlib import aclosing
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, AsyncIterator, Dict, List
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
 
 import autogen
 from mcp import StdioServerParameters
 from mcp.client.session import ClientSession
 from mcp.client.stdio import stdio_client
-from openai import AsyncOpenAI
+from openai import APIError, AsyncOpenAI
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from ..settings import get_settings
 from .tools import (
+    get_custom_async_function_map,
     get_custom_function_map,
     get_custom_tool_schemas,
+    make_async_http_client,
 )
 
 logger = logging.getLogger(__name__)
 
 
+def _dumps(obj: Any) -> str:
+    """Compact JSON text for model-facing payloads (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, default=str, separators=(",", ":"))
+
+
+def _loads(data: str | bytes) -> Any:
+    """Parse JSON text; decode errors are ``json.JSONDecodeError`` either way."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 PROJECT_ROOT = Path(__file__).resolve().parents[3]
 MCP_ROOT = PROJECT_ROOT / "mcp_servers"
+# Persisted MCP tool schemas, so a restart can skip discovery.
+SCHEMA_CACHE_PATH = PROJECT_ROOT / ".cache" / "mcp_tools.json"
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionState:
     """Per-session conversation state."""
 
@@ -32,9 +59,203 @@ class SessionState:
     messages: List[Dict[str, str]] = field(default_factory=list)
     investigation_summary: str = ""
     tool_calls_count: int = 0
+    # Serializes turns of the same session so their messages never interleave.
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False, compare=False)
+
+
+# In-memory sessions, least recently used first; bounded by settings.max_sessions.
+SESSIONS: "OrderedDict[str, SessionState]" = OrderedDict()
+
+
+# Tools whose results depend only on their arguments and may be replayed from
+# the turn's ToolResultCache; any other tool may write, so it clears the cache.
+_CACHEABLE_TOOL_PREFIXES = ("get_", "list_", "search_", "check_")
+_CACHEABLE_CUSTOM_TOOLS = frozenset(
+    {
+        "extract_entities",
+        "extract_entities_batch",
+        "summarize_state",
+        "check_requires_confirmation",
+    }
+)
+
+
+def _is_cacheable_tool(name: str) -> bool:
+    """Return True for tools that do not change state (see _CACHEABLE_TOOL_PREFIXES)."""
+    return name in _CACHEABLE_CUSTOM_TOOLS or name.startswith(_CACHEABLE_TOOL_PREFIXES)
+
+
+@dataclass(slots=True)
+class ToolResultCache:
+    """Results of read-only tool calls within one agent turn, oldest first.
+
+    Deliberately per turn rather than per session: a session-long cache
+    would keep serving reads after writes made elsewhere (other sessions,
+    other processes, the MCP servers' own files), and this process has no
+    way to observe those. Within a turn, its own writes clear the cache.
+
+    Calls still running are kept in ``pending``, so duplicates gathered in
+    the same round or started early while streaming await one dispatch.
+    """
+
+    entries: "OrderedDict[str, str]" = field(default_factory=OrderedDict)
+    pending: "Dict[str, asyncio.Task[str]]" = field(default_factory=dict)
+    # Bumped on every clear; a read that started before the latest clear
+    # may have seen pre-write data, so its result is not stored.
+    generation: int = 0
+
+    def clear(self) -> None:
+        """Drop every entry, stop sharing in-flight calls and start a new generation."""
+        self.entries.clear()
+        self.pending.clear()
+        self.generation += 1
+
+
+def _tool_cache_key(name: str, arguments: Dict[str, Any]) -> str:
+    """Key a tool call by name and canonical (key-sorted) JSON arguments."""
+    if orjson is not None:
+        encoded = orjson.dumps(
+            arguments, option=orjson.OPT_SORT_KEYS, default=str
+        ).decode()
+    else:
+        encoded = json.dumps(arguments, sort_keys=True, default=str)
+    return f"{name}:{encoded}"
+
+
+# With settings.lazy_tool_schemas the model first sees only this meta tool,
+# whose description lists every tool in one line each, and asks for the full
+# schemas it needs. Bounded so a confused model cannot loop forever.
+GET_TOOL_SCHEMA_NAME = "get_tool_schema"
+_MAX_SCHEMA_ROUNDS = 3
+
+
+def _history_within_budget(
+    messages: List[Dict[str, str]], token_budget: int
+) -> List[Dict[str, str]]:
+    """Return the newest messages whose estimated token count fits the budget.
+
+    Tokens are estimated as len(content) // 4, which is close enough for
+    English text and avoids a tokenizer dependency.
+
+    Args:
+        messages: Conversation messages, oldest first.
+        token_budget: Maximum estimated tokens to keep (int).
+
+    Returns:
+        List[Dict[str, str]]: A suffix of messages, oldest first.
+    """
+    used = 0
+    start = len(messages)
+    while start > 0:
+        cost = len(messages[start - 1]["content"]) // 4 + 1
+        if used + cost > token_budget:
+            break
+        used += cost
+        start -= 1
+    return messages[start:]
+
+
+def _tool_schema_result(schema: Dict[str, Any] | None, tool_name: str) -> str:
+    """Format a get_tool_schema reply for the model."""
+    if schema is None:
+        return f"Error: unknown tool {tool_name!r}"
+    return _dumps(schema["function"])
+
+
+def _tool_index_schema(tools: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the get_tool_schema meta tool advertising every tool by name.
+
+    Args:
+        tools: Full tool schemas in OpenAI function format.
+
+    Returns:
+        Dict[str, Any]: The meta tool's schema.
+    """
+    lines = []
+    for tool in tools:
+        fn = tool["function"]
+        summary = (fn.get("description") or "").strip().splitlines()
+        lines.append(f"- {fn['name']}: {summary[0] if summary else ''}")
+    return {
+        "type": "function",
+        "function": {
+            "name": GET_TOOL_SCHEMA_NAME,
+            "description": (
+                "Get the full parameter schema of a tool so you can call it. "
+                "Available tools:\n" + "\n".join(lines)
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "name": {
+                        "type": "string",
+                        "enum": [t["function"]["name"] for t in tools],
+                    },
+                },
+                "required": ["name"],
+            },
+        },
+    }
+
+
+@dataclass
+class MCPConnection:
+    """An open MCP stdio session and the tools its server exposes."""
+
+    name: str
+    session: ClientSession
+    tools: List[Any]
+    stop: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+@dataclass(frozen=True)
+class ToolCatalog:
+    """Every tool schema offered to the model, with the lookups derived from it."""
+
+    mcp_tools: List[Dict[str, Any]] | None
+    all_tools: List[Dict[str, Any]]
+    by_name: Dict[str, Dict[str, Any]]
+    index_schema: Dict[str, Any] | None
+
+
+def _build_tool_catalog(mcp_tools: List[Dict[str, Any]] | None) -> ToolCatalog:
+    """Combine the custom tools with a snapshot of the MCP tools."""
+    all_tools = get_custom_tool_schemas() + (mcp_tools or [])
+    return ToolCatalog(
+        mcp_tools=mcp_tools,
+        all_tools=all_tools,
+        by_name={t["function"]["name"]: t for t in all_tools},
+        index_schema=_tool_index_schema(all_tools) if all_tools else None,
+    )
+
+
+def _server_fingerprint(server_params: StdioServerParameters) -> List[Any]:
+    """Identify a server build by its command line and its script's mtime."""
+    try:
+        mtime = Path(server_params.args[-1]).stat().st_mtime_ns
+    except OSError:
+        mtime = None
+    return [server_params.command, *server_params.args, mtime]
+
+
+def _read_schema_cache() -> Dict[str, Any]:
+    """Load the persisted tool schemas, or an empty dict if unavailable."""
+    try:
+        data = _loads(SCHEMA_CACHE_PATH.read_bytes())
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
 
 
-SESSIONS: Dict[str, SessionState] = {}
+def _write_schema_cache(servers: Dict[str, Any]) -> None:
+    """Atomically persist tool schemas keyed by MCP server name."""
+    try:
+        SCHEMA_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = SCHEMA_CACHE_PATH.with_suffix(".tmp")
+        tmp_path.write_text(_dumps(servers), encoding="utf-8")
+        os.replace(tmp_path, SCHEMA_CACHE_PATH)
+    except OSError as e:
+        logger.warning("Could not write MCP schema cache: %s", e)
 
 
 class JewelryOpsAgentService:
@@ -42,32 +263,39 @@ class JewelryOpsAgentService:
 
     def __init__(self) -> None:
         self._mcp_tools_cache: List[Dict[str, Any]] | None = None
+        # Built from the current _mcp_tools_cache list and rebuilt only when
+        # discovery or a background refresh replaces that list.
+        self._tool_catalog: ToolCatalog | None = None
+        # Serializes first-time discovery so concurrent requests share one load.
+        self._mcp_tools_lock = asyncio.Lock()
+        # MCP servers are spawned and initialized once, then kept open. Each
+        # session is held by its own task (_hold_connection) so it can be
+        # opened from any request and still be closed cleanly by aclose().
+        self._mcp_sessions: Dict[str, MCPConnection] = {}
+        self._mcp_tasks: Dict[str, asyncio.Task[None]] = {}
+        self._connect_locks: Dict[str, asyncio.Lock] = {}
+        # Tool name -> name of the MCP server serving it, so dispatch is one lookup.
+        self._tool_to_server: Dict[str, str] = {}
+        self._refresh_task: asyncio.Task[None] | None = None
+        # One chat client (and HTTP connection pool) for every request; rebuilt
+        # only if the API key or base URL setting changes.
+        self._openai_client: AsyncOpenAI | None = None
+        self._openai_client_key: Tuple[str | None, str | None] | None = None
+        self._mcp_configs = self._build_mcp_configs()
+        self._env = {"PYTHONPATH": str(PROJECT_ROOT), **os.environ}
+        # Launch parameters for every validly configured server, parsed once.
+        self._server_params: Dict[str, StdioServerParameters] = self._build_server_params()
+
+    @staticmethod
+    def _build_mcp_configs() -> List[Dict[str, Any]]:
+        """Describe the MCP servers to start, from settings.
 
-    def get_session(self, session_id: str) -> SessionState:
-        """Return or create the SessionState for the given session_id.
-        
-        Args:
-            session_id: Unique identifier for the session (str).
-            
-        Returns:
-            SessionState: Session object containing messages, summary, and tool call count.
-        """
-        if session_id not in SESSIONS:
-            SESSIONS[session_id] = SessionState(session_id=session_id)
-        return SESSIONS[session_id]
-
-
-    async def _load_mcp_tools_async(self) -> List[Dict[str, Any]]:
-        """Load tools from all MCP servers and convert to OpenAI function format.
-        
         Returns:
-            List[Dict[str, Any]]: List of tool schemas in OpenAI function format.
-                Each dict contains {"type": "function", "function": {...}}.
+            List[Dict[str, Any]]: One dict per server with name, default_cmd
+                and config_cmd (None when the server is not configured).
         """
         settings = get_settings()
-        env = {"PYTHONPATH": str(PROJECT_ROOT), **os.environ}
-
-        mcp_configs = [
+        return [
             {
                 "name": "jewelryops_mysql",
                 "default_cmd": str(MCP_ROOT / "jewelryops_mysql" / "server.py"),
@@ -85,9 +313,17 @@ class JewelryOpsAgentService:
             },
         ]
 
-        all_tools: List[Dict[str, Any]] = []
+    def _build_server_params(self) -> Dict[str, StdioServerParameters]:
+        """Parse each configured MCP command into stdio launch parameters.
 
-        for config in mcp_configs:
+        Servers without a command, or with one that is not "<executable>
+        <script> [args...]", are logged once here and left out.
+
+        Returns:
+            Dict[str, StdioServerParameters]: Launch parameters keyed by server name.
+        """
+        server_params: Dict[str, StdioServerParameters] = {}
+        for config in self._mcp_configs:
             cmd = config["config_cmd"]
             if not cmd:
                 logger.info(
@@ -105,45 +341,245 @@ class JewelryOpsAgentService:
                 )
                 continue
 
-            server_params = StdioServerParameters(
+            server_params[config["name"]] = StdioServerParameters(
                 command=cmd_parts[0],
                 args=cmd_parts[1:],
-                env=env,
+                env=self._env,
             )
+        return server_params
 
-            try:
-                async with stdio_client(server_params) as (read, write):
-                    async with ClientSession(read, write) as session:
-                        await session.initialize()
-                        tools_result = await session.list_tools()
-                        for tool_info in tools_result.tools:
-                            tool_schema = {
-                                "type": "function",
-                                "function": {
-                                    "name": tool_info.name,
-                                    "description": tool_info.description or "",
-                                    "parameters": tool_info.inputSchema or {},
-                                },
-                            }
-                            all_tools.append(tool_schema)
-            except (OSError, ConnectionError, TimeoutError) as e:
-                logger.warning(
-                    "Failed to connect to MCP server '%s': %s",
-                    config["name"],
-                    e,
-                )
+    def get_session(self, session_id: str) -> SessionState:
+        """Return or create the SessionState for the given session_id.
+        
+        Args:
+            session_id: Unique identifier for the session (str).
+            
+        Returns:
+            SessionState: Session object containing messages, summary, and tool call count.
+        """
+        session = SESSIONS.get(session_id)
+        if session is not None:
+            SESSIONS.move_to_end(session_id)
+            return session
+
+        session = SESSIONS[session_id] = SessionState(session_id=session_id)
+        max_sessions = get_settings().max_sessions
+        while len(SESSIONS) > max_sessions:
+            SESSIONS.popitem(last=False)
+        return session
+
+
+    async def _load_mcp_tools_async(
+        self, use_cache: bool = True
+    ) -> tuple[List[Dict[str, Any]], bool]:
+        """Load tools from all MCP servers and convert to OpenAI function format.
+
+        Schemas are read from SCHEMA_CACHE_PATH when a server's command line
+        and script mtime still match; other servers are connected and listed,
+        and the cache file is rewritten.
+
+        Args:
+            use_cache: Whether persisted schemas may be used (bool).
+
+        Returns:
+            tuple[List[Dict[str, Any]], bool]: Tool schemas in OpenAI function
+                format ({"type": "function", "function": {...}}), and whether
+                every server was served from the cache.
+        """
+        cached = _read_schema_cache() if use_cache else {}
+        names = list(self._server_params)
+
+        # Servers are independent, so discover them concurrently.
+        results = await asyncio.gather(
+            *(self._discover_one(name, cached.get(name)) for name in names)
+        )
+
+        servers: Dict[str, Any] = {}
+        all_tools: List[Dict[str, Any]] = []
+        tool_to_server: Dict[str, str] = {}
+        all_cached = True
+        for name, result in zip(names, results):
+            if result is None:
+                all_cached = False
                 continue
+            entry, from_cache = result
+            all_cached = all_cached and from_cache
+            servers[name] = entry
+            for tool_schema in entry["tools"]:
+                tool_to_server.setdefault(tool_schema["function"]["name"], name)
+                all_tools.append(tool_schema)
+
+        self._tool_to_server = tool_to_server
+        if servers != cached:
+            _write_schema_cache(servers)
+        return all_tools, all_cached
+
+    async def _discover_one(
+        self, name: str, cached_entry: Any
+    ) -> tuple[Dict[str, Any], bool] | None:
+        """Get one server's tool schemas from its cache entry or the live server.
+
+        Args:
+            name: MCP server config name (str).
+            cached_entry: The server's entry from the schema cache, if any.
+
+        Returns:
+            tuple[Dict[str, Any], bool] | None: The cache entry to store
+                ({"fingerprint": ..., "tools": [...]}) and whether it came
+                from the cache, or None if the server could not be reached.
+        """
+        fingerprint = _server_fingerprint(self._server_params[name])
+        if (
+            isinstance(cached_entry, dict)
+            and cached_entry.get("fingerprint") == fingerprint
+        ):
+            return cached_entry, True
+
+        try:
+            connection = await self._ensure_connected(name)
+        except (OSError, ConnectionError, TimeoutError) as e:
+            logger.warning("Failed to connect to MCP server '%s': %s", name, e)
+            return None
+
+        tools = [
+            {
+                "type": "function",
+                "function": {
+                    "name": tool_info.name,
+                    "description": tool_info.description or "",
+                    "parameters": tool_info.inputSchema or {},
+                },
+            }
+            for tool_info in connection.tools
+        ]
+        return {"fingerprint": fingerprint, "tools": tools}, False
+
+    async def _refresh_mcp_tools(self) -> None:
+        """Rediscover tools from the live servers after serving cached schemas."""
+        try:
+            tools, _ = await self._load_mcp_tools_async(use_cache=False)
+        except (OSError, ConnectionError, TimeoutError, ValueError) as e:
+            logger.warning("Background MCP schema refresh failed: %s", e)
+            return
+        self._mcp_tools_cache = tools
+
+    async def _ensure_connected(self, name: str) -> MCPConnection:
+        """Return the open session for an MCP server, starting it on first use.
+
+        Args:
+            name: MCP server config name (str).
+
+        Returns:
+            MCPConnection: The live session and the server's tools.
+        """
+        connection = self._mcp_sessions.get(name)
+        if connection is not None:
+            return connection
+
+        lock = self._connect_locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            connection = self._mcp_sessions.get(name)
+            if connection is not None:
+                return connection
+            ready: asyncio.Future[MCPConnection] = (
+                asyncio.get_running_loop().create_future()
+            )
+            self._mcp_tasks[name] = asyncio.create_task(
+                self._hold_connection(name, self._server_params[name], ready)
+            )
+            return await ready
+
+    async def _hold_connection(
+        self,
+        name: str,
+        server_params: StdioServerParameters,
+        ready: "asyncio.Future[MCPConnection]",
+    ) -> None:
+        """Open an MCP session, publish it through `ready`, and keep it open until stopped.
+
+        The stdio_client/ClientSession contexts must be exited by the task
+        that entered them, hence one long-lived task per server.
+        """
+        try:
+            async with stdio_client(server_params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    tools_result = await session.list_tools()
+                    connection = MCPConnection(
+                        name=name,
+                        session=session,
+                        tools=list(tools_result.tools),
+                    )
+                    self._mcp_sessions[name] = connection
+                    ready.set_result(connection)
+                    await connection.stop.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning("MCP server '%s' session ended: %s", name, e)
+        finally:
+            if not ready.done():
+                ready.cancel()
+            self._mcp_sessions.pop(name, None)
+            self._mcp_tasks.pop(name, None)
+
+    def _get_client(self, settings_obj: Any) -> AsyncOpenAI:
+        """Return the shared AsyncOpenAI client, building it on first use.
 
-        return all_tools
+        Args:
+            settings_obj: Current Settings (api key and base URL are read).
+
+        Returns:
+            AsyncOpenAI: Client reused across requests for connection keep-alive.
+        """
+        key = (settings_obj.openai_api_key, settings_obj.openai_base_url)
+        if self._openai_client is None or self._openai_client_key != key:
+            self._openai_client = AsyncOpenAI(
+                api_key=key[0],
+                base_url=key[1],
+                http_client=make_async_http_client(),
+            )
+            self._openai_client_key = key
+        return self._openai_client
+
+    async def aclose(self) -> None:
+        """Close all open MCP sessions, stop their server processes, and close the chat client."""
+        pending: List[asyncio.Task[None]] = list(self._mcp_tasks.values())
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            pending.append(self._refresh_task)
+            self._refresh_task = None
+        for connection in list(self._mcp_sessions.values()):
+            connection.stop.set()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._mcp_sessions.clear()
+        self._mcp_tasks.clear()
+        self._tool_to_server.clear()
+        self._mcp_tools_cache = None
+        if self._openai_client is not None:
+            await self._openai_client.close()
+            self._openai_client = None
+            self._openai_client_key = None
 
     async def get_mcp_tools_async(self) -> List[Dict[str, Any]]:
         """Get MCP tools, loading them if needed (cached).
-        
+
+        When every schema came from the on-disk cache it is served right
+        away and refreshed from the servers in the background.
+
         Returns:
             List[Dict[str, Any]]: Cached list of MCP tool schemas in OpenAI format.
         """
         if self._mcp_tools_cache is None:
-            self._mcp_tools_cache = await self._load_mcp_tools_async()
+            async with self._mcp_tools_lock:
+                if self._mcp_tools_cache is None:
+                    tools, from_cache = await self._load_mcp_tools_async()
+                    self._mcp_tools_cache = tools
+                    if from_cache and tools:
+                        self._refresh_task = asyncio.create_task(
+                            self._refresh_mcp_tools()
+                        )
         return self._mcp_tools_cache or []
 
     def get_mcp_tools(self) -> List[Dict[str, Any]]:
@@ -154,87 +590,110 @@ class JewelryOpsAgentService:
         """
         return self._mcp_tools_cache or []
 
+    def get_tool_catalog(self) -> ToolCatalog:
+        """Return the shared catalog of custom and MCP tool schemas.
+
+        Returns:
+            ToolCatalog: Catalog for the currently loaded MCP tools; treat as read-only.
+        """
+        catalog = self._tool_catalog
+        if catalog is None or catalog.mcp_tools is not self._mcp_tools_cache:
+            catalog = _build_tool_catalog(self._mcp_tools_cache)
+            self._tool_catalog = catalog
+        return catalog
+
+
+    async def execute_tool_async(
+        self,
+        name: str,
+        arguments: Dict[str, Any],
+        cache: ToolResultCache | None = None,
+    ) -> str:
+        """Execute a tool by name. Custom tools run in-process; MCP tools over their open stdio session.
+
+        With a cache, repeated read-only calls are answered from it or join
+        the identical call already in flight, and any other tool call clears
+        it both before and after running.
 
-    async def execute_tool_async(self, name: str, arguments: Dict[str, Any]) -> str:
-        """Execute a tool by name. Custom tools run in-process; MCP tools via stdio.
-        
         Args:
             name: Name of the tool to execute (str).
             arguments: Dict of tool arguments.
-            
+            cache: Optional per-turn ToolResultCache.
+
         Returns:
             str: JSON-formatted tool result or error message.
         """
+        if cache is None or name == GET_TOOL_SCHEMA_NAME:
+            return await self._run_tool(name, arguments)
+
+        if not _is_cacheable_tool(name):
+            cache.clear()
+            try:
+                return await self._run_tool(name, arguments)
+            finally:
+                cache.clear()
+
+        entries = cache.entries
+        key = _tool_cache_key(name, arguments)
+        cached = entries.get(key)
+        if cached is not None:
+            entries.move_to_end(key)
+            logger.info("Tool %s answered from turn cache", name)
+            return cached
+
+        in_flight = cache.pending.get(key)
+        if in_flight is not None:
+            logger.info("Tool %s joined an identical in-flight call", name)
+            # Shielded so a cancelled waiter does not cancel the shared call.
+            return await asyncio.shield(in_flight)
+
+        generation = cache.generation
+        task = asyncio.ensure_future(self._run_tool(name, arguments))
+        cache.pending[key] = task
+        try:
+            result = await asyncio.shield(task)
+        finally:
+            if cache.pending.get(key) is task:
+                del cache.pending[key]
+        if not result.startswith("Error") and cache.generation == generation:
+            entries[key] = result
+            while len(entries) > get_settings().tool_result_cache_size:
+                entries.popitem(last=False)
+        return result
+
+    async def _run_tool(self, name: str, arguments: Dict[str, Any]) -> str:
+        """Dispatch a tool call to a custom function or its MCP server (uncached)."""
         logger.info("Executing tool: %s", name)
-        custom_functions = get_custom_function_map()
-        if name in custom_functions:
+        func = get_custom_async_function_map().get(name) or get_custom_function_map().get(name)
+        if func is not None:
             logger.debug(f"Executing custom tool: {name}")
-            func = custom_functions[name]
-            result = func(**arguments)
+            # Blocking tools run in a worker thread so they never stall the loop.
+            if inspect.iscoroutinefunction(func):
+                result = await func(**arguments)
+            else:
+                result = await asyncio.to_thread(func, **arguments)
             logger.info(f"Custom tool {name} completed successfully")
             return result
 
-        logger.debug(f"Tool {name} not found in custom tools, checking MCP servers...")
-        settings = get_settings()
-        env = {"PYTHONPATH": str(PROJECT_ROOT), **os.environ}
+        if name == GET_TOOL_SCHEMA_NAME:
+            # Only reached when get_tool_schema is mixed with real calls or
+            # the schema rounds ran out; the schema is informational then.
+            tool_name = str(arguments.get("name", ""))
+            schema = self.get_tool_catalog().by_name.get(tool_name)
+            return _tool_schema_result(schema, tool_name)
 
-        mcp_configs = [
-            {
-                "name": "jewelryops_mysql",
-                "default_cmd": str(MCP_ROOT / "jewelryops_mysql" / "server.py"),
-                "config_cmd": settings.mcp_jewelryops_cmd,
-            },
-            {
-                "name": "notion_mock",
-                "default_cmd": str(MCP_ROOT / "notion_mock" / "server.py"),
-                "config_cmd": settings.mcp_notion_cmd,
-            },
-            {
-                "name": "gmail_mock",
-                "default_cmd": str(MCP_ROOT / "gmail_mock" / "server.py"),
-                "config_cmd": settings.mcp_gmail_cmd,
-            },
-        ]
-
-        for config in mcp_configs:
-            cmd = config["config_cmd"]
-            if not cmd:
-                continue
-
-            cmd_parts = cmd.split()
-            if len(cmd_parts) < 2:
-                continue
+        logger.debug(f"Tool {name} not found in custom tools, checking MCP servers...")
+        if self._mcp_tools_cache is None:
+            await self.get_mcp_tools_async()
 
-            server_params = StdioServerParameters(
-                command=cmd_parts[0],
-                args=cmd_parts[1:],
-                env=env,
-            )
-
-            try:
-                async with stdio_client(server_params) as (read, write):
-                    async with ClientSession(read, write) as session:
-                        await session.initialize()
-                        tools_result = await session.list_tools()
-                        tool_names = [t.name for t in tools_result.tools]
-                        if name in tool_names:
-                            logger.info(
-                                "Calling MCP tool %s on server %s",
-                                name,
-                                config["name"],
-                            )
-                            result = await session.call_tool(name, arguments)
-                            if result.content:
-                                return result.content[0].text or ""
-                            return json.dumps(result, indent=2, default=str)
-            except (OSError, ConnectionError, TimeoutError) as e:
-                logger.debug(
-                    "MCP server %s did not provide tool %s: %s",
-                    config["name"],
-                    name,
-                    e,
-                )
-                continue
+        server = self._tool_to_server.get(name)
+        if server is not None:
+            connection = await self._ensure_connected(server)
+            logger.info("Calling MCP tool %s on server %s", name, connection.name)
+            result = await connection.session.call_tool(name, arguments)
+            if result.content:
+                return result.content[0].text or ""
+            return _dumps(result)
 
         logger.error(f"Tool {name} not found on any MCP server or custom tools")
         return f"Error: Tool {name} not found"
@@ -269,9 +728,9 @@ class JewelryOpsAgentService:
                     f"{msg['role']}: {content_preview}"
                 )
 
-        custom_tools = get_custom_tool_schemas()
-        mcp_tools = await self.get_mcp_tools_async()
-        all_tools = custom_tools + mcp_tools
+        await self.get_mcp_tools_async()
+        # Shallow copy: the catalog list is shared with every other turn.
+        all_tools = list(self.get_tool_catalog().all_tools)
 
         llm_config = {
             "model": settings.model,
@@ -296,6 +755,119 @@ class JewelryOpsAgentService:
         return agent
 
 
+    async def _stream_tool_calls(
+        self,
+        client: AsyncOpenAI,
+        model: str,
+        temperature: float,
+        messages: List[Dict[str, Any]],
+        tools: List[Dict[str, Any]],
+        on_call_complete: Callable[[Dict[str, Any]], None] | None = None,
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        """Run one streamed completion and assemble the tool calls and text it produces.
+
+        Tool calls stream one after another, so a call is complete as soon as
+        the next index appears; ``on_call_complete`` fires at that point (and
+        for the last call when the stream ends) so execution can overlap with
+        the rest of the stream.
+
+        Args:
+            client: OpenAI-compatible async client.
+            model: Model name (str).
+            temperature: Sampling temperature (float).
+            messages: Conversation so far.
+            tools: Tool schemas offered to the model.
+            on_call_complete: Optional callback receiving each finished call.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], str]: Tool calls as {"id", "name",
+            "arguments"} dicts, and the assistant text content.
+        """
+        calls_by_index: Dict[int, Dict[str, Any]] = {}
+        current: Dict[str, Any] | None = None
+        content_parts: List[str] = []
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            tools=tools if tools else None,
+            tool_choice="auto",
+            stream=True,
+            temperature=temperature,
+        )
+
+        async for chunk in stream:
+            if chunk.choices and len(chunk.choices) > 0:
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    content_parts.append(delta.content)
+                if delta.tool_calls:
+                    for tool_call_delta in delta.tool_calls:
+                        index = tool_call_delta.index
+                        if index is None:
+                            continue
+                        tc = calls_by_index.get(index)
+                        if tc is None:
+                            if current is not None and on_call_complete is not None:
+                                on_call_complete(current)
+                            tc = calls_by_index[index] = {"id": "", "name": "", "arguments": ""}
+                            current = tc
+                        if tool_call_delta.id:
+                            tc["id"] = tool_call_delta.id
+                        if tool_call_delta.function:
+                            if tool_call_delta.function.name:
+                                tc["name"] = tool_call_delta.function.name
+                            if tool_call_delta.function.arguments:
+                                tc["arguments"] += tool_call_delta.function.arguments
+        if current is not None and on_call_complete is not None:
+            on_call_complete(current)
+        calls = [calls_by_index[index] for index in sorted(calls_by_index)]
+        return calls, "".join(content_parts)
+
+    def _answer_schema_requests(
+        self,
+        requested: List[Dict[str, Any]],
+        by_name: Dict[str, Dict[str, Any]],
+        offered_tools: List[Dict[str, Any]],
+        messages: List[Dict[str, Any]],
+    ) -> None:
+        """Reply to get_tool_schema calls and add the named tools to the offer.
+
+        Args:
+            requested: get_tool_schema calls from the last completion.
+            by_name: Every available tool schema, keyed by tool name.
+            offered_tools: Schemas offered to the model; extended in place.
+            messages: Conversation; the assistant call and tool replies are appended.
+        """
+        messages.append(
+            {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": tc["id"],
+                        "type": "function",
+                        "function": {"name": tc["name"], "arguments": tc["arguments"]},
+                    }
+                    for tc in requested
+                ],
+            }
+        )
+        for tc in requested:
+            try:
+                tool_name = _loads(tc["arguments"] or "{}").get("name", "")
+            except (json.JSONDecodeError, AttributeError):
+                tool_name = ""
+            schema = by_name.get(tool_name)
+            if schema is not None and schema not in offered_tools:
+                offered_tools.append(schema)
+            messages.append(
+                {
+                    "role": "tool",
+                    "tool_call_id": tc["id"],
+                    "content": _tool_schema_result(schema, tool_name),
+                }
+            )
+
     async def run_agent_stream(
         self, session_id: str, user_message: str
     ) -> AsyncIterator[str]:
@@ -306,75 +878,156 @@ class JewelryOpsAgentService:
             user_message: User query text (str).
             
         Yields:
-            str: Individual tokens from agent response including investigation steps and thoughts.
+            str: Response text chunks, as streamed by the model, including investigation steps and thoughts.
         """
         logger.info(f"Starting agent session: {session_id}")
         logger.debug(f"User message: {user_message[:200]}")
         session = self.get_session(session_id)
+        # get_session never awaits, so lookup-or-create is already atomic on
+        # the event loop; only whole turns need serializing.
+        async with session.lock:
+            async with aclosing(self._run_turn(session, user_message)) as stream:
+                async for text in stream:
+                    yield text
+
+    async def _run_turn(
+        self, session: SessionState, user_message: str
+    ) -> AsyncIterator[str]:
+        """Run one agent turn for a session; the caller holds session.lock.
+
+        Args:
+            session: SessionState for the conversation.
+            user_message: User query text (str).
+
+        Yields:
+            str: Response text chunks (see run_agent_stream).
+        """
         session.messages.append({"role": "user", "content": user_message})
 
         agent = await self.build_agent_async(session)
 
         settings_obj = get_settings()
-        client = AsyncOpenAI(
-            api_key=settings_obj.openai_api_key,
-            base_url=settings_obj.openai_base_url,
-        )
+        client = self._get_client(settings_obj)
 
         messages: List[Dict[str, Any]] = [
             {"role": "system", "content": agent.system_message}
         ]
-        for msg in session.messages[-10:]:
+        # The system message already carries the investigation summary, so
+        # once there is one only the latest exchange is replayed verbatim.
+        history = session.messages[-2:] if session.investigation_summary else session.messages
+        for msg in _history_within_budget(history, settings_obj.history_token_budget):
             messages.append({"role": msg["role"], "content": msg["content"]})
         messages.append({"role": "user", "content": user_message})
 
-        custom_tools = get_custom_tool_schemas()
-        mcp_tools = self.get_mcp_tools()
-        all_tools = custom_tools + mcp_tools
+        catalog = self.get_tool_catalog()
 
         full_response = ""
         tool_calls_made: List[Dict[str, Any]] = []
 
-        try:
-            stream = await client.chat.completions.create(
-                model=settings_obj.model,
-                messages=messages,
-                tools=all_tools if all_tools else None,
-                tool_choice="auto",
-                stream=True,
-                temperature=settings_obj.temperature,
-            )
+        if settings_obj.lazy_tool_schemas and catalog.index_schema is not None:
+            offered_tools = [catalog.index_schema]
+        else:
+            offered_tools = catalog.all_tools
+
+        # Read-only tool calls run as soon as the stream has finished emitting
+        # them, so execution overlaps the rest of the completion; other calls
+        # wait for the stream to end. A semaphore bounds concurrency and
+        # results are still collected in call order.
+        semaphore = asyncio.Semaphore(max(1, settings_obj.tool_max_concurrency))
+        tool_cache = ToolResultCache()
+        started: List[asyncio.Task] = []
+        # Set once the stream emits a write; later reads must wait for it.
+        write_emitted = False
+
+        async def run_tool_call(tc: Dict[str, Any]) -> str:
+            try:
+                args = _loads(tc["arguments"]) if tc["arguments"] else {}
+            except json.JSONDecodeError as e:
+                logger.error("Invalid tool arguments for %s: %s", tc["name"], e)
+                return f"Error: invalid arguments - {e}"
+            try:
+                async with semaphore:
+                    return await self.execute_tool_async(tc["name"], args, tool_cache)
+            except (APIError, OSError, ConnectionError, TimeoutError, ValueError) as e:
+                logger.error("Error executing tool %s: %s", tc["name"], e)
+                return f"Error: {e}"
+
+        def start_tool_call(tc: Dict[str, Any]) -> None:
+            # Schema requests are answered in-line by the lazy-schema loop.
+            # Only read-only calls start early, and only until a write is
+            # emitted: a write must not run unless the stream completes and
+            # its call is recorded in messages, and reads after it must see it.
+            nonlocal write_emitted
+            if not tc["name"] or tc["name"] == GET_TOOL_SCHEMA_NAME:
+                return
+            if not _is_cacheable_tool(tc["name"]):
+                write_emitted = True
+            elif not write_emitted:
+                tc["task"] = asyncio.create_task(run_tool_call(tc))
+                started.append(tc["task"])
+
+        async def run_tool_calls(calls: List[Dict[str, Any]]) -> List[str]:
+            # Consecutive reads run concurrently; every other call is a
+            # barrier that waits for the calls before it and finishes before
+            # any later call starts, so writes keep the model's order.
+            results: List[str] = [""] * len(calls)
+            batch: List[Tuple[int, Any]] = []
+
+            async def drain() -> None:
+                done = await asyncio.gather(*(pending for _, pending in batch))
+                for (i, _), result in zip(batch, done):
+                    results[i] = result
+                batch.clear()
+
+            for i, tc in enumerate(calls):
+                if _is_cacheable_tool(tc["name"]):
+                    batch.append((i, tc.get("task") or run_tool_call(tc)))
+                else:
+                    await drain()
+                    results[i] = await run_tool_call(tc)
+            await drain()
+            return results
 
-            async for chunk in stream:
-                if chunk.choices and len(chunk.choices) > 0:
-                    delta = chunk.choices[0].delta
-                    if delta.tool_calls:
-                        for tool_call_delta in delta.tool_calls:
-                            if tool_call_delta.index is not None:
-                                while (
-                                    len(tool_calls_made)
-                                    <= tool_call_delta.index
-                                ):
-                                    tool_calls_made.append(
-                                        {"id": "", "name": "", "arguments": ""}
-                                    )
-                                tc = tool_calls_made[tool_call_delta.index]
-                                if tool_call_delta.id:
-                                    tc["id"] = tool_call_delta.id
-                                if tool_call_delta.function:
-                                    if tool_call_delta.function.name:
-                                        tc["name"] = tool_call_delta.function.name
-                                    if tool_call_delta.function.arguments:
-                                        tc["arguments"] += (
-                                            tool_call_delta.function.arguments
-                                        )
-
-            tool_names_in_order: List[str] = []
-            if tool_calls_made:
-                tool_calls_for_message: List[Dict[str, Any]] = []
-                for tc in tool_calls_made:
-                    if tc["name"]:
-                        tool_calls_for_message.append(
+        try:
+            for schema_round in range(_MAX_SCHEMA_ROUNDS):
+                tool_calls_made, full_response = await self._stream_tool_calls(
+                    client,
+                    settings_obj.model,
+                    settings_obj.temperature,
+                    messages,
+                    offered_tools,
+                    on_call_complete=start_tool_call,
+                )
+                requested = [tc for tc in tool_calls_made if tc["name"]]
+                if (
+                    not requested
+                    or schema_round == _MAX_SCHEMA_ROUNDS - 1
+                    or any(tc["name"] != GET_TOOL_SCHEMA_NAME for tc in requested)
+                ):
+                    break
+                # Schema-only round: hand back the requested schemas, offer
+                # those tools, and ask again.
+                self._answer_schema_requests(requested, catalog.by_name, offered_tools, messages)
+
+            named_calls = [tc for tc in tool_calls_made if tc["name"]]
+            if not named_calls:
+                # The first completion already holds the answer, so there is
+                # no second round trip for a final summary.
+                logger.info(f"Session {session.session_id}: No tools were called for this query")
+                yield (
+                    "\nInvestigation Steps:\n"
+                    "(no tools were called for this query)\n"
+                )
+                yield "\nThoughts:\n"
+                if full_response:
+                    yield full_response
+            else:
+                tool_names_in_order = [tc["name"] for tc in named_calls]
+                messages.append(
+                    {
+                        "role": "assistant",
+                        "content": full_response or None,
+                        "tool_calls": [
                             {
                                 "id": tc["id"],
                                 "type": "function",
@@ -383,110 +1036,75 @@ class JewelryOpsAgentService:
                                     "arguments": tc["arguments"],
                                 },
                             }
-                        )
-                        tool_names_in_order.append(tc["name"])
+                            for tc in named_calls
+                        ],
+                    }
+                )
 
-                if tool_calls_for_message:
+                for tc in named_calls:
+                    session.tool_calls_count += 1
+                    logger.info(f"Processing tool call #{session.tool_calls_count}: {tc['name']}")
+                results = await run_tool_calls(named_calls)
+                for tc, result in zip(named_calls, results):
                     messages.append(
                         {
-                            "role": "assistant",
-                            "content": full_response or None,
-                            "tool_calls": tool_calls_for_message,
+                            "role": "tool",
+                            "tool_call_id": tc["id"],
+                            "content": result,
                         }
                     )
 
-                for tc in tool_calls_made:
-                    if tc["name"]:
-                        session.tool_calls_count += 1
-                        logger.info(f"Processing tool call #{session.tool_calls_count}: {tc['name']}")
-                        try:
-                            args = (
-                                json.loads(tc["arguments"])
-                                if tc["arguments"]
-                                else {}
-                            )
-                            result = await self.execute_tool_async(
-                                tc["name"], args
-                            )
-                            messages.append(
-                                {
-                                    "role": "tool",
-                                    "tool_call_id": tc["id"],
-                                    "content": result,
-                                }
-                            )
-                        except json.JSONDecodeError as e:
-                            logger.error(
-                                "Invalid tool arguments for %s: %s",
-                                tc["name"],
-                                e,
-                            )
-                            messages.append(
-                                {
-                                    "role": "tool",
-                                    "tool_call_id": tc["id"],
-                                    "content": f"Error: invalid arguments - {e}",
-                                }
-                            )
-                        except (OSError, ConnectionError, TimeoutError, ValueError) as e:
-                            logger.error("Error executing tool %s: %s", tc["name"], e)
-                            messages.append(
-                                {
-                                    "role": "tool",
-                                    "tool_call_id": tc["id"],
-                                    "content": f"Error: {e}",
-                                }
-                            )
-
-                if tool_names_in_order:
-                    logger.info(f"Session {session.session_id}: Tools called in order: {', '.join(tool_names_in_order)}")
-                    yield "\nInvestigation Steps:\n"
-                    for i, tool_name in enumerate(tool_names_in_order, 1):
-                        yield f"{i}. {tool_name}\n"
-                else:
-                    logger.info(f"Session {session.session_id}: No tools were called for this query")
-                    yield (
-                        "\nInvestigation Steps:\n"
-                        "(no tools were called for this query)\n"
-                    )
+                logger.info(f"Session {session.session_id}: Tools called in order: {', '.join(tool_names_in_order)}")
+                yield "\nInvestigation Steps:\n"
+                for i, tool_name in enumerate(tool_names_in_order, 1):
+                    yield f"{i}. {tool_name}\n"
 
-                summary_messages = messages + [
-                    {
-                        "role": "system",
-                        "content": (
-                            "You have already called tools and seen their JSON results. "
-                            "Now produce your final thoughts for a human colleague.\n\n"
-                            "- Do NOT include raw JSON objects or code blocks in your reply.\n"
-                            "- Do NOT paste full tool responses.\n"
-                            "- Refer to tools by name (e.g. get_order, get_customer) and "
-                            "summarize what they showed in plain language.\n"
-                            "- Write concise, readable prose only."
-                        ),
-                    }
-                ]
+                yield "\nThoughts:\n"
+                if not settings_obj.enable_final_summary:
+                    full_response = (
+                        f"Checked {', '.join(dict.fromkeys(tool_names_in_order))}; "
+                        "the final summary is disabled."
+                    )
+                    yield full_response
+                else:
+                    summary_messages = messages + [
+                        {
+                            "role": "system",
+                            "content": (
+                                "You have already called tools and seen their JSON results. "
+                                "Now produce your final thoughts for a human colleague.\n\n"
+                                "- Do NOT include raw JSON objects or code blocks in your reply.\n"
+                                "- Do NOT paste full tool responses.\n"
+                                "- Refer to tools by name (e.g. get_order, get_customer) and "
+                                "summarize what they showed in plain language.\n"
+                                "- Write concise, readable prose only."
+                            ),
+                        }
+                    ]
 
-                final_stream = await client.chat.completions.create(
-                    model=settings_obj.model,
-                    messages=summary_messages,
-                    stream=True,
-                    temperature=settings_obj.temperature,
-                )
+                    final_stream = await client.chat.completions.create(
+                        model=settings_obj.model,
+                        messages=summary_messages,
+                        stream=True,
+                        temperature=settings_obj.temperature,
+                    )
 
-                yield "\nThoughts:\n"
-                final_response = ""
-                async for chunk in final_stream:
-                    if chunk.choices and len(chunk.choices) > 0:
-                        delta = chunk.choices[0].delta
-                        if delta.content:
-                            final_response += delta.content
-                            for ch in delta.content:
-                                yield ch
+                    final_parts: List[str] = []
+                    async for chunk in final_stream:
+                        if chunk.choices and len(chunk.choices) > 0:
+                            delta = chunk.choices[0].delta
+                            if delta.content:
+                                final_parts.append(delta.content)
+                                yield delta.content
 
-                full_response = final_response
+                    full_response = "".join(final_parts)
 
         except (TimeoutError, ConnectionError, ValueError) as e:
             logger.exception("Agent execution failed: %s", e)
             yield f"Error during agent execution: {e}"
+        finally:
+            for task in started:
+                task.cancel()
 
         if full_response:
             session.messages.append(
@@ -494,6 +1112,10 @@ class JewelryOpsAgentService:
             )
             session.investigation_summary = full_response[:500]
 
+        max_messages = settings_obj.max_session_messages
+        if len(session.messages) > max_messages:
+            del session.messages[:-max_messages]
+
 
 
 _SERVICE = JewelryOpsAgentService()
@@ -518,9 +1140,15 @@ async def run_agent_stream(
         yield token
 
 
+async def close_mcp_sessions() -> None:
+    await _SERVICE.aclose()
+
+
 __all__ = [
     "JewelryOpsAgentService",
+    "MCPConnection",
     "SessionState",
+    "close_mcp_sessions",
     "get_session",
     "get_mcp_tools",
     "get_mcp_tools_async",
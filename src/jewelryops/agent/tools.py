@@ -1,33 +1,450 @@
+import asyncio
+import hashlib
+import importlib.util
 import json
 import logging
 import re
 from functools import lru_cache
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Tuple
 
-from openai import OpenAI
+import httpx
+from openai import APIError, AsyncOpenAI, DefaultAsyncHttpxClient, OpenAI
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from ..services.llm_cache import get_llm_cache, llm_cache_key
 from ..settings import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Connection pool for the async OpenAI clients; HTTP/2 needs the optional h2 package.
+_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+# Queries per extract_entities_batch request; larger batches save little more
+# and make a malformed reply cost more rows.
+_ENTITY_BATCH_SIZE = 8
+
+# Local verdicts for check_requires_confirmation; anything else goes to the
+# LLM. Matches are whole words in the listed inflections, and letters (not
+# underscores) delimit words so tool names such as add_note also count.
+_CONFIRM_WRITE_RE = re.compile(
+    r"(?<![a-z])("
+    r"add|adds|added|adding|"
+    r"create|creates|created|creating|"
+    r"send|sends|sent|sending|"
+    r"delete|deletes|deleted|deleting|"
+    r"remove|removes|removed|removing|"
+    r"refund|refunds|refunded|refunding|"
+    r"cancel|cancels|cancell?ed|cancell?ing|"
+    r"update|updates|updated|updating|"
+    r"write|writes|wrote|written|writing|"
+    r"charge|charges|charged|charging|"
+    r"modify|modifies|modified|modifying"
+    r")(?![a-z])",
+    re.IGNORECASE,
+)
+# Words that are nouns as often as verbs ("the email", "open issues"); they
+# mark a write only where a clause's verb would be.
+_CONFIRM_CLAUSE_WRITE_RE = re.compile(
+    r"(?:^|[,;&]|(?<![a-z])(?:and|then|also|plus)(?![a-z]))\s*"
+    r"(email|emails|emailed|emailing|reply|replies|replied|replying|"
+    r"issue|issues|issued|issuing|forward|forwards|forwarded|forwarding)(?![a-z])",
+    re.IGNORECASE,
+)
+# The whole description must be a read verb (or read tool name such as
+# get_order), optional qualifiers, known object nouns and IDs, and nothing
+# else; any other word may hide a write, so those go to the LLM.
+_CONFIRM_READ_ONLY_RE = re.compile(
+    r"\s*(?:get|list|show|search|read|fetch|view|check)(?:_[a-z]+)*"
+    r"(?:\s+(?:the|a|an|all|my|open|closed|latest|recent|new|pending|current))*"
+    r"(?:\s+(?:order|orders|customer|customers|issue|issues|email|emails|note|notes|"
+    r"inventory|stock|item|items|sku|skus|status|details))*"
+    r"(?:\s+(?:for\s+|of\s+)?[a-z]+[-_]\d+)*"
+    r"\s*\.?\s*",
+    re.IGNORECASE,
+)
+
+
+def _loads(data: str) -> Any:
+    """Parse JSON text; decode errors are ``json.JSONDecodeError`` either way."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _extract_json_object(text: str, opening: str = "{", closing: str = "}") -> str | None:
+    """Return the first balanced {...} object (or [...] array) in a model reply, or None.
+
+    A reply that is entirely one JSON value (the usual case in JSON mode)
+    is returned after a single parse. Otherwise a linear scan tracks brace
+    depth and skips braces inside JSON strings (honouring backslash
+    escapes); unlike a greedy regex it cannot backtrack over long replies.
+
+    Args:
+        text: Raw model reply (str).
+        opening: Opening bracket to match (str, default "{"; "[" for arrays).
+        closing: Matching closing bracket (str, default "}").
 
-@lru_cache(maxsize=1)
-def _tool_timeout() -> float:
-    """Lazy-read timeout from settings (avoids import cycle at module load).
-    
     Returns:
-        float: Tool request timeout in seconds.
+        str | None: The JSON object text, or None if there is no complete one.
     """
-    return get_settings().tool_request_timeout_seconds
+    stripped = text.strip()
+    if stripped[:1] == opening:
+        try:
+            _loads(stripped)
+            return stripped
+        except json.JSONDecodeError:
+            pass
+    start = text.find(opening)
+    if start < 0:
+        return None
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == opening:
+            depth += 1
+        elif ch == closing:
+            depth -= 1
+            if depth == 0:
+                return text[start : i + 1]
+    return None
+
+
+def _extract_json_array(text: str) -> str | None:
+    """Return the first balanced [...] array in a model reply, or None."""
+    return _extract_json_object(text, "[", "]")
+
+
+def _extract_top_level_json_array(text: str) -> str | None:
+    """Return the first balanced [...] array unless an object opens before it.
+
+    An object reply such as ``{"skus": ["RING-101"]}`` would otherwise yield
+    its nested array.
+    """
+    array = _extract_json_array(text)
+    if array is None:
+        return None
+    brace = text.find("{")
+    if 0 <= brace < text.find("["):
+        return None
+    return array
+
+
+def _tool_client_kwargs() -> Dict[str, Any]:
+    """Connection settings shared by the sync and async tool clients."""
+    settings = get_settings()
+    return {
+        "api_key": settings.tool_api_key or settings.openai_api_key,
+        "base_url": settings.tool_base_url or settings.openai_base_url,
+        "timeout": settings.tool_request_timeout_seconds,
+    }
 
 
+@lru_cache(maxsize=1)
 def _make_tool_client() -> OpenAI:
-    """Construct an OpenAI client for tool calls (uses tool_* settings and timeout)."""
+    """Return the shared OpenAI client for tool calls (uses tool_* settings and timeout).
+
+    Cached so every tool call reuses one client and its pooled HTTP
+    connections instead of paying a new TCP/TLS handshake each time.
+    """
+    return OpenAI(**_tool_client_kwargs())
+
+
+def make_async_http_client() -> DefaultAsyncHttpxClient:
+    """Return a pooled httpx client for AsyncOpenAI (HTTP/2 when h2 is installed).
+
+    Concurrent streams share a few multiplexed keep-alive connections
+    instead of each opening its own TLS session.
+
+    Returns:
+        DefaultAsyncHttpxClient: httpx client with OpenAI's defaults and our pool limits.
+    """
+    return DefaultAsyncHttpxClient(http2=_HTTP2, limits=_HTTP_LIMITS)
+
+
+@lru_cache(maxsize=1)
+def _make_async_tool_client() -> AsyncOpenAI:
+    """Return the shared AsyncOpenAI client used by the *_async tool variants."""
+    return AsyncOpenAI(**_tool_client_kwargs(), http_client=make_async_http_client())
+
+
+async def close_tool_clients() -> None:
+    """Close the shared tool clients and their connection pools. Idempotent."""
+    if _make_async_tool_client.cache_info().currsize:
+        await _make_async_tool_client().close()
+        _make_async_tool_client.cache_clear()
+    if _make_tool_client.cache_info().currsize:
+        _make_tool_client().close()
+        _make_tool_client.cache_clear()
+
+
+@lru_cache(maxsize=8)
+def _tool_request_base(
+    tool_name: str, prompt_setting: str, json_object: bool = True
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Build the static part of a tool's requests once from settings.
+
+    The static system prompt leads so the provider can reuse its cached
+    prefix; ``prompt_cache_key`` (tool name plus a prompt digest) routes
+    calls sharing that prefix together and changes when the prompt does.
+
+    Args:
+        tool_name: Tool name, used in the prompt cache key (str).
+        prompt_setting: Name of the Settings field holding the system prompt (str).
+        json_object: Ask for JSON mode, which guarantees a single JSON object
+            reply (bool, default True; False for tools that expect an array).
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, str]]: Completion kwargs other than
+            messages, and the system message.
+    """
     settings = get_settings()
-    return OpenAI(
-        api_key=settings.tool_api_key or settings.openai_api_key,
-        base_url=settings.tool_base_url or settings.openai_base_url,
-        timeout=settings.tool_request_timeout_seconds,
+    system_prompt: str = getattr(settings, prompt_setting)
+    digest = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:12]
+    kwargs = {
+        "model": settings.tool_model,
+        "temperature": 0.0,
+        "timeout": settings.tool_request_timeout_seconds,
+        "extra_body": {"prompt_cache_key": f"tool:{tool_name}:{digest}"},
+    }
+    if json_object:
+        kwargs["response_format"] = {"type": "json_object"}
+    return kwargs, {"role": "system", "content": system_prompt}
+
+
+def _tool_request(
+    tool_name: str, prompt_setting: str, user_content: str, json_object: bool = True
+) -> Dict[str, Any]:
+    """Build the chat completion kwargs for one tool call.
+
+    Args:
+        tool_name: Tool name, used in the prompt cache key (str).
+        prompt_setting: Name of the Settings field holding the system prompt (str).
+        user_content: User message for the tool model (str).
+        json_object: Ask for JSON mode (bool, default True).
+
+    Returns:
+        Dict[str, Any]: Keyword arguments for ``chat.completions.create``.
+    """
+    kwargs, system_message = _tool_request_base(tool_name, prompt_setting, json_object)
+    return {
+        **kwargs,
+        "messages": [system_message, {"role": "user", "content": user_content}],
+    }
+
+
+def _reply_result(
+    content: str,
+    on_plain_text: Callable[[str], str],
+    extract: Callable[[str], str | None],
+) -> str:
+    """Return the JSON value in a tool model reply, or on_plain_text's fallback."""
+    json_value = extract(content)
+    if json_value is not None:
+        return json_value
+    return on_plain_text(content)
+
+
+def _tool_call(
+    tool_name: str,
+    request: Dict[str, Any],
+    on_plain_text: Callable[[str], str],
+    on_error: Callable[[Exception], str],
+    extract: Callable[[str], str | None] = _extract_json_object,
+) -> str:
+    """Run a tool model request, answering repeats from the in-process LLM cache.
+
+    Args:
+        tool_name: Tool name, for logging (str).
+        request: Chat completion kwargs from `_tool_request`.
+        on_plain_text: Builds the result when the reply has no JSON object.
+        on_error: Builds the error payload when the request or response fails,
+            including API errors such as a backend rejecting response_format.
+        extract: Finds the JSON value in the reply (default: first object).
+
+    Returns:
+        str: JSON string result for the tool.
+    """
+    cache = get_llm_cache()
+    key = llm_cache_key(request["model"], request["messages"], request["temperature"])
+    content = cache.get_local(key) if key else None
+    if content is None:
+        try:
+            response = _make_tool_client().chat.completions.create(**request)
+        except (APIError, TimeoutError, ConnectionError) as e:
+            logger.error("Tool %s request failed: %s", tool_name, e)
+            return on_error(e)
+        try:
+            content = response.choices[0].message.content or ""
+        except (AttributeError, KeyError, IndexError) as e:
+            logger.error("Tool %s response parse failed: %s", tool_name, e)
+            return on_error(e)
+        if key:
+            cache.set_local(key, content)
+    return _reply_result(content, on_plain_text, extract)
+
+
+async def _tool_call_async(
+    tool_name: str,
+    request: Dict[str, Any],
+    on_plain_text: Callable[[str], str],
+    on_error: Callable[[Exception], str],
+    extract: Callable[[str], str | None] = _extract_json_object,
+) -> str:
+    """Async `_tool_call`; the LLM cache also consults Redis when configured."""
+    cache = get_llm_cache()
+    key = llm_cache_key(request["model"], request["messages"], request["temperature"])
+    content = await cache.get(key) if key else None
+    if content is None:
+        try:
+            response = await _make_async_tool_client().chat.completions.create(**request)
+        except (APIError, TimeoutError, ConnectionError) as e:
+            logger.error("Tool %s request failed: %s", tool_name, e)
+            return on_error(e)
+        try:
+            content = response.choices[0].message.content or ""
+        except (AttributeError, KeyError, IndexError) as e:
+            logger.error("Tool %s response parse failed: %s", tool_name, e)
+            return on_error(e)
+        if key:
+            await cache.set(key, content)
+    return _reply_result(content, on_plain_text, extract)
+
+
+def _entities_request(query: str) -> Dict[str, Any]:
+    return _tool_request(
+        "extract_entities",
+        "extract_entities_system_prompt",
+        f"Extract entities from: {query}",
+    )
+
+
+def _entities_error(e: Exception) -> str:
+    return json.dumps(
+        {"customer_ids": [], "order_ids": [], "skus": [], "error": str(e)}
+    )
+
+
+def _entities_batch_request(queries: List[str]) -> Dict[str, Any]:
+    items = "\n".join(f"{i}) {query}" for i, query in enumerate(queries, 1))
+    return _tool_request(
+        "extract_entities_batch",
+        "extract_entities_batch_system_prompt",
+        (
+            "Extract entities from each item and return a JSON array with "
+            f"one object per item, in order:\n{items}"
+        ),
+        json_object=False,
+    )
+
+
+def _entities_batch_rows(reply: str, count: int) -> List[Any]:
+    """Split a batch reply into one entity object per query.
+
+    An error payload (a single object) is repeated for every query; any
+    other reply that is not a top-level array of `count` objects becomes an
+    error row.
+    """
+    try:
+        rows = json.loads(reply)
+    except json.JSONDecodeError as e:
+        rows = json.loads(_entities_error(e))
+    if (
+        isinstance(rows, list)
+        and len(rows) == count
+        and all(isinstance(row, dict) for row in rows)
+    ):
+        return rows
+    if not isinstance(rows, dict) or "error" not in rows:
+        rows = json.loads(
+            _entities_error(ValueError(f"expected a JSON array of {count} objects"))
+        )
+    return [rows] * count
+
+
+def _summary_request(history: str, current_notes: str) -> Dict[str, Any]:
+    return _tool_request(
+        "summarize_state",
+        "summarize_state_system_prompt",
+        (
+            "Summarize this investigation:\n\n"
+            f"History:\n{history}\n\n"
+            f"Additional notes:\n{current_notes}"
+        ),
+    )
+
+
+def _summary_text(content: str) -> str:
+    return json.dumps({"summary": content, "key_findings": [], "open_items": []})
+
+
+def _summary_error(e: Exception) -> str:
+    return json.dumps({"error": str(e), "summary": "Unable to summarize"})
+
+
+def _confirmation_request(action_description: str) -> Dict[str, Any]:
+    return _tool_request(
+        "check_requires_confirmation",
+        "check_requires_confirmation_system_prompt",
+        f"Does this action require user confirmation? {action_description}",
+    )
+
+
+def _confirmation_local(action_description: str) -> str | None:
+    """Classify clearly writing or read-only actions without the LLM; None if unclear.
+
+    A write verb anywhere requires confirmation. An action is read-only only
+    when the whole description fits the strict read grammar ("get order
+    ORD-1"); a false "safe" verdict would skip confirmation for a write, so
+    everything else is left to the LLM.
+    """
+    match = _CONFIRM_WRITE_RE.search(action_description) or _CONFIRM_CLAUSE_WRITE_RE.search(
+        action_description
+    )
+    if match is not None:
+        return json.dumps(
+            {
+                "requires_confirmation": True,
+                "reason": f"Action involves '{match.group(1).lower()}'",
+            }
+        )
+    if _CONFIRM_READ_ONLY_RE.fullmatch(action_description):
+        return json.dumps(
+            {"requires_confirmation": False, "reason": "Read-only action"}
+        )
+    return None
+
+
+def _confirmation_text(content: str) -> str:
+    return json.dumps(
+        {
+            "requires_confirmation": True,
+            "reason": "Unable to determine - defaulting to safe choice",
+        }
+    )
+
+
+def _confirmation_error(e: Exception) -> str:
+    return json.dumps(
+        {
+            "requires_confirmation": True,
+            "reason": f"Error checking confirmation: {e}",
+        }
     )
 
 
@@ -47,39 +464,67 @@ def extract_entities(query: str) -> str:
               "skus": ["RING-101"]
             }
     """
-    settings = get_settings()
-    client = _make_tool_client()
+    return _tool_call(
+        "extract_entities", _entities_request(query), lambda c: c, _entities_error
+    )
 
-    try:
-        response = client.chat.completions.create(
-            model=settings.tool_model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": settings.extract_entities_system_prompt,
-                },
-                {"role": "user", "content": f"Extract entities from: {query}"},
-            ],
-            temperature=0.0,
-            timeout=_tool_timeout(),
-        )
-    except (TimeoutError, ConnectionError) as e:
-        logger.error("Tool extract_entities request failed: %s", e)
-        return json.dumps(
-            {"customer_ids": [], "order_ids": [], "skus": [], "error": str(e)}
+
+async def extract_entities_async(query: str) -> str:
+    """Async variant of `extract_entities` on the shared AsyncOpenAI client."""
+    return await _tool_call_async(
+        "extract_entities", _entities_request(query), lambda c: c, _entities_error
+    )
+
+
+def extract_entities_batch(queries: List[str]) -> str:
+    """Extract entities from several texts, batching up to 8 per LLM call.
+
+    Each batch is one request whose reply is a JSON array, which saves a
+    round trip per text compared with calling `extract_entities` in a loop.
+
+    Args:
+        queries: Free text queries to extract entities from (List[str]).
+
+    Returns:
+        JSON array string with one `extract_entities`-style object per query,
+        in input order.
+    """
+    rows: List[Any] = []
+    for start in range(0, len(queries), _ENTITY_BATCH_SIZE):
+        batch = queries[start : start + _ENTITY_BATCH_SIZE]
+        reply = _tool_call(
+            "extract_entities_batch",
+            _entities_batch_request(batch),
+            lambda c: c,
+            _entities_error,
+            _extract_top_level_json_array,
         )
+        rows.extend(_entities_batch_rows(reply, len(batch)))
+    return json.dumps(rows)
 
-    try:
-        content = response.choices[0].message.content or ""
-        json_match = re.search(r"\{.*\}", content, re.DOTALL)
-        if json_match:
-            return json_match.group(0)
-        return content
-    except (AttributeError, KeyError, IndexError) as e:
-        logger.error("Tool extract_entities response parse failed: %s", e)
-        return json.dumps(
-            {"customer_ids": [], "order_ids": [], "skus": [], "error": str(e)}
+
+async def extract_entities_batch_async(queries: List[str]) -> str:
+    """Async variant of `extract_entities_batch`; batches run concurrently."""
+    batches = [
+        queries[start : start + _ENTITY_BATCH_SIZE]
+        for start in range(0, len(queries), _ENTITY_BATCH_SIZE)
+    ]
+    replies = await asyncio.gather(
+        *(
+            _tool_call_async(
+                "extract_entities_batch",
+                _entities_batch_request(batch),
+                lambda c: c,
+                _entities_error,
+                _extract_top_level_json_array,
+            )
+            for batch in batches
         )
+    )
+    rows: List[Any] = []
+    for batch, reply in zip(batches, replies):
+        rows.extend(_entities_batch_rows(reply, len(batch)))
+    return json.dumps(rows)
 
 
 def summarize_state(history: str, current_notes: str = "") -> str:
@@ -94,50 +539,30 @@ def summarize_state(history: str, current_notes: str = "") -> str:
     Returns:
         JSON string with keys: summary, key_findings, open_items.
     """
-    settings = get_settings()
-    client = _make_tool_client()
+    return _tool_call(
+        "summarize_state",
+        _summary_request(history, current_notes),
+        _summary_text,
+        _summary_error,
+    )
 
-    try:
-        response = client.chat.completions.create(
-            model=settings.tool_model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": settings.summarize_state_system_prompt,
-                },
-                {
-                    "role": "user",
-                    "content": (
-                        "Summarize this investigation:\n\n"
-                        f"History:\n{history}\n\n"
-                        f"Additional notes:\n{current_notes}"
-                    ),
-                },
-            ],
-            temperature=0.0,
-            timeout=_tool_timeout(),
-        )
-    except (TimeoutError, ConnectionError) as e:
-        logger.error("Tool summarize_state request failed: %s", e)
-        return json.dumps({"error": str(e), "summary": "Unable to summarize"})
 
-    try:
-        content = response.choices[0].message.content or ""
-        json_match = re.search(r"\{.*\}", content, re.DOTALL)
-        if json_match:
-            return json_match.group(0)
-        return json.dumps(
-            {"summary": content, "key_findings": [], "open_items": []}
-        )
-    except (AttributeError, KeyError, IndexError) as e:
-        logger.error("Tool summarize_state response parse failed: %s", e)
-        return json.dumps({"error": str(e), "summary": "Unable to summarize"})
+async def summarize_state_async(history: str, current_notes: str = "") -> str:
+    """Async variant of `summarize_state` on the shared AsyncOpenAI client."""
+    return await _tool_call_async(
+        "summarize_state",
+        _summary_request(history, current_notes),
+        _summary_text,
+        _summary_error,
+    )
 
 
 def check_requires_confirmation(action_description: str) -> str:
     """Check if a proposed action needs explicit user approval using LLM.
 
-    Uses the configured `check_requires_confirmation_system_prompt` in settings.
+    Clearly destructive actions (delete, refund, cancel, ...) and clearly
+    read-only ones (get, list, show, ...) are classified locally; only the
+    rest use the configured `check_requires_confirmation_system_prompt`.
     
     Args:
         action_description: Description of the action to check (str).
@@ -145,56 +570,28 @@ def check_requires_confirmation(action_description: str) -> str:
     Returns:
         JSON string: { "requires_confirmation": true/false, "reason": "..." }
     """
-    settings = get_settings()
-    client = _make_tool_client()
+    local = _confirmation_local(action_description)
+    if local is not None:
+        return local
+    return _tool_call(
+        "check_requires_confirmation",
+        _confirmation_request(action_description),
+        _confirmation_text,
+        _confirmation_error,
+    )
 
-    try:
-        response = client.chat.completions.create(
-            model=settings.tool_model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": settings.check_requires_confirmation_system_prompt,
-                },
-                {
-                    "role": "user",
-                    "content": (
-                        "Does this action require user confirmation? "
-                        f"{action_description}"
-                    ),
-                },
-            ],
-            temperature=0.0,
-            timeout=_tool_timeout(),
-        )
-    except (TimeoutError, ConnectionError) as e:
-        logger.error("Tool check_requires_confirmation request failed: %s", e)
-        return json.dumps(
-            {
-                "requires_confirmation": True,
-                "reason": f"Error checking confirmation: {e}",
-            }
-        )
 
-    try:
-        content = response.choices[0].message.content or ""
-        json_match = re.search(r"\{.*\}", content, re.DOTALL)
-        if json_match:
-            return json_match.group(0)
-        return json.dumps(
-            {
-                "requires_confirmation": True,
-                "reason": "Unable to determine - defaulting to safe choice",
-            }
-        )
-    except (AttributeError, KeyError, IndexError) as e:
-        logger.error("Tool check_requires_confirmation response parse failed: %s", e)
-        return json.dumps(
-            {
-                "requires_confirmation": True,
-                "reason": f"Error checking confirmation: {e}",
-            }
-        )
+async def check_requires_confirmation_async(action_description: str) -> str:
+    """Async variant of `check_requires_confirmation` on the shared AsyncOpenAI client."""
+    local = _confirmation_local(action_description)
+    if local is not None:
+        return local
+    return await _tool_call_async(
+        "check_requires_confirmation",
+        _confirmation_request(action_description),
+        _confirmation_text,
+        _confirmation_error,
+    )
 
 
 @lru_cache(maxsize=1)
@@ -222,6 +619,27 @@ def get_custom_tool_schemas() -> List[Dict[str, Any]]:
                     },
                 },
             },
+            {
+                "type": "function",
+                "function": {
+                    "name": "extract_entities_batch",
+                    "description": (
+                        "Extract customer IDs, order IDs, and SKU codes from several "
+                        "texts at once; returns one result object per text, in order"
+                    ),
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "queries": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "The texts to extract entities from",
+                            }
+                        },
+                        "required": ["queries"],
+                    },
+                },
+            },
             {
                 "type": "function",
                 "function": {
@@ -272,6 +690,7 @@ def _get_cached_function_map() -> Dict[str, Any]:
     """
     return {
         "extract_entities": extract_entities,
+        "extract_entities_batch": extract_entities_batch,
         "summarize_state": summarize_state,
         "check_requires_confirmation": check_requires_confirmation,
     }
@@ -284,3 +703,18 @@ def get_custom_function_map() -> Dict[str, Any]:
         Dict[str, Any]: Map of tool names to functions.
     """
     return _get_cached_function_map()
+
+
+@lru_cache(maxsize=1)
+def get_custom_async_function_map() -> Dict[str, Any]:
+    """Return the coroutine variants of the custom tools, keyed by tool name (cached).
+
+    Returns:
+        Dict[str, Any]: Map of tool names to async functions.
+    """
+    return {
+        "extract_entities": extract_entities_async,
+        "extract_entities_batch": extract_entities_batch_async,
+        "summarize_state": summarize_state_async,
+        "check_requires_confirmation": check_requires_confirmation_async,
+    }
@@ -1,18 +1,48 @@
+import asyncio
 import json
 import logging
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterator
 
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-
-from .agent import get_mcp_tools_async, get_session, run_agent_stream
-from .services.context_service import close_context_service, get_context_service_async
+from fastapi.websockets import WebSocketState
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .agent import (
+    close_mcp_sessions,
+    close_tool_clients,
+    get_mcp_tools_async,
+    get_session,
+    run_agent_stream,
+)
+from .services.context_service import (
+    close_context_service,
+    get_cached_context_service,
+    get_context_service_async,
+)
+from .services.llm_cache import close_llm_cache
+from .services.redis import close_redis_crud_service
 from .settings import get_settings
 
+# Token frames are sent as binary: this tag followed by the UTF-8 token text.
+# Skips a JSON encode per streamed token; control frames stay JSON.
+TOKEN_FRAME_TAG = b"T"
+# Tokens arriving within this window (or up to this many) share one frame;
+# the client just appends frame text, so batching is invisible to it.
+TOKEN_BATCH_WINDOW_SECONDS = 0.015
+TOKEN_BATCH_MAX_TOKENS = 8
+# Turns only stage their session context; a background task writes staged
+# contexts to Redis this often (and once more on shutdown).
+CONTEXT_FLUSH_INTERVAL_SECONDS = 5.0
+
 
 def setup_server_logging() -> logging.Logger:
     """Configure and return the server logger."""
@@ -37,6 +67,90 @@ def setup_server_logging() -> logging.Logger:
     return logger
 
 
+async def _coalesce_tokens(
+    tokens: AsyncIterator[str],
+    window: float = TOKEN_BATCH_WINDOW_SECONDS,
+    max_tokens: int = TOKEN_BATCH_MAX_TOKENS,
+) -> AsyncIterator[str]:
+    """Merge streamed tokens into chunks of up to max_tokens or `window` seconds.
+
+    A buffered chunk is flushed as soon as its window closes, even while the
+    source is stalled (e.g. during tool calls), so nothing waits on the next token.
+    The source is closed when this generator is.
+    """
+    loop = asyncio.get_running_loop()
+    buffer: list[str] = []
+    deadline = 0.0
+    next_token = asyncio.ensure_future(anext(tokens))
+    try:
+        while True:
+            timeout = max(0.0, deadline - loop.time()) if buffer else None
+            done, _ = await asyncio.wait({next_token}, timeout=timeout)
+            if not done:
+                yield "".join(buffer)
+                buffer.clear()
+                continue
+            try:
+                token = next_token.result()
+            except StopAsyncIteration:
+                break
+            except BaseException:
+                # Deliver what already arrived before surfacing the error.
+                if buffer:
+                    yield "".join(buffer)
+                raise
+            if token:
+                if not buffer:
+                    deadline = loop.time() + window
+                buffer.append(token)
+                if len(buffer) >= max_tokens:
+                    yield "".join(buffer)
+                    buffer.clear()
+            next_token = asyncio.ensure_future(anext(tokens))
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        # Stop the pending read, then close the source so a run_agent_stream
+        # left behind by a disconnected client releases its session lock now
+        # rather than at garbage collection.
+        next_token.cancel()
+        await asyncio.wait({next_token})
+        aclose = getattr(tokens, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+async def _flush_contexts_periodically(
+    interval: float = CONTEXT_FLUSH_INTERVAL_SECONDS,
+) -> None:
+    """Write staged session contexts to Redis off the request path; reconnects if needed."""
+    while True:
+        await asyncio.sleep(interval)
+        context_service = await get_context_service_async()
+        if context_service is not None:
+            await context_service.flush_contexts()
+
+
+async def _send_json(websocket: WebSocket, data: dict[str, Any]) -> None:
+    """Send a JSON control frame as text, encoded with orjson when installed."""
+    if orjson is not None:
+        await websocket.send_text(orjson.dumps(data).decode())
+    else:
+        await websocket.send_text(json.dumps(data, separators=(",", ":")))
+
+
+async def _close_with_error(websocket: WebSocket, message: str) -> None:
+    """Send an error frame and close the socket; a no-op once either side has closed."""
+    if (
+        websocket.client_state != WebSocketState.CONNECTED
+        or websocket.application_state != WebSocketState.CONNECTED
+    ):
+        return
+    with suppress(OSError, RuntimeError):
+        await _send_json(websocket, {"type": "error", "data": message})
+        await websocket.close()
+
+
 def _cors_origins_list(origins: str) -> list[str]:
     """Parse CORS_ORIGINS into a list."""
     if not origins or origins.strip() == "*":
@@ -50,7 +164,7 @@ settings = get_settings()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load MCP tools and optional Redis context at startup; close Redis on shutdown."""
+    """Load MCP tools and optional Redis context at startup; close both on shutdown."""
     LOGGER.info("Loading MCP tools at startup...")
     try:
         await get_mcp_tools_async()
@@ -68,11 +182,23 @@ async def lifespan(app: FastAPI):
         LOGGER.info("Context service (Redis) ready")
     except Exception as e:
         LOGGER.debug("Context service not available: %s", e)
+    context_flusher = asyncio.create_task(_flush_contexts_periodically())
 
     yield
 
     LOGGER.info("Shutting down...")
+    context_flusher.cancel()
+    with suppress(asyncio.CancelledError):
+        await context_flusher
+    try:
+        await close_mcp_sessions()
+    except (OSError, RuntimeError) as e:
+        LOGGER.warning("Error closing MCP sessions: %s", e)
+    await close_tool_clients()
     await close_context_service()
+    close_llm_cache()
+    # Both services above share this one Redis client; close it last, once.
+    await close_redis_crud_service()
 
 
 app = FastAPI(
@@ -115,8 +241,8 @@ async def chat_ws(websocket: WebSocket) -> None:
         }
         
     Response Format:
-        Streams JSON objects with fields:
-        - {"type": "token", "data": str} - individual response tokens
+        Streams frames:
+        - binary b"T" + UTF-8 token text - individual response tokens
         - {"type": "done", "session_id": str, "tool_calls_count": int} - completion message
         - {"type": "error", "data": str} - error message if applicable
     """
@@ -124,40 +250,36 @@ async def chat_ws(websocket: WebSocket) -> None:
     try:
         raw = await websocket.receive_text()
         try:
-            payload = json.loads(raw)
+            payload = orjson.loads(raw) if orjson is not None else json.loads(raw)
         except json.JSONDecodeError as e:
             LOGGER.error("Invalid WS payload (not JSON): %s", e)
-            await websocket.send_json({"type": "error", "data": "Invalid JSON payload"})
-            await websocket.close()
+            await _close_with_error(websocket, "Invalid JSON payload")
             return
 
         session_id = str(payload.get("session_id") or "default")
         message = str(payload.get("message") or "").strip()
 
         if not message:
-            await websocket.send_json({"type": "error", "data": "Empty message"})
-            await websocket.close()
+            await _close_with_error(websocket, "Empty message")
             return
 
         LOGGER.info("WS chat start session_id=%s", session_id)
 
         try:
-            async for token in run_agent_stream(session_id=session_id, user_message=message):
-                if token:
-                    await websocket.send_json({"type": "token", "data": token})
-        except (TimeoutError, ConnectionError) as e:
-            LOGGER.exception("Network error during agent streaming: %s", e)
-            await websocket.send_json({"type": "error", "data": str(e)})
-            await websocket.close()
-            return
-        except ValueError as e:
-            LOGGER.exception("Agent configuration or state error: %s", e)
-            await websocket.send_json({"type": "error", "data": str(e)})
-            await websocket.close()
+            tokens = run_agent_stream(session_id=session_id, user_message=message)
+            async for chunk in _coalesce_tokens(tokens):
+                await websocket.send_bytes(TOKEN_FRAME_TAG + chunk.encode("utf-8"))
+        except (TimeoutError, ConnectionError, ValueError) as e:
+            LOGGER.exception("Agent streaming failed: %s", e)
+            await _close_with_error(websocket, str(e))
             return
 
         session = get_session(session_id)
-        await websocket.send_json(
+        context_service = get_cached_context_service()
+        if context_service is not None:
+            context_service.stage_context(session_id, session)
+        await _send_json(
+            websocket,
             {
                 "type": "done",
                 "session_id": session_id,
@@ -169,13 +291,6 @@ async def chat_ws(websocket: WebSocket) -> None:
         LOGGER.info("WS disconnect")
     except (ConnectionError, TimeoutError, RuntimeError) as e:
         LOGGER.exception("Unexpected WS error: %s", e)
-        try:
-            await websocket.send_json({"type": "error", "data": str(e)})
-        except (OSError, RuntimeError, ValueError, TypeError):
-            pass
-        try:
-            await websocket.close()
-        except (OSError, RuntimeError):
-            pass
+        await _close_with_error(websocket, str(e))
 
 
@@ -2,7 +2,7 @@ from dataclasses import dataclass, field
 from typing import Dict, List
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionState:
     """Per-session conversation state (messages, summary, tool call count)."""
 
@@ -1,10 +1,16 @@
 import json
 import logging
+import time
 from typing import Any, Dict
 
 from redis.exceptions import ConnectionError as RedisConnectionError
 from redis.exceptions import TimeoutError as RedisTimeoutError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from ..models import SessionState
 from ..services.redis import RedisCrudService
 from ..settings import get_settings
@@ -13,6 +19,26 @@ from .redis import get_redis_crud_service
 logger = logging.getLogger(__name__)
 
 CONTEXT_KEY_PREFIX = "context:"
+# After a failed connect, get_context_service_async returns None without
+# retrying for this long.
+CONNECT_RETRY_SECONDS = 30.0
+
+
+def _dumps(data: Dict[str, Any]) -> str | bytes:
+    """Encode context JSON: UTF-8 bytes from orjson when installed, else a stdlib json str.
+
+    Redis accepts either, so orjson output is written without a decode copy.
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data)
+
+
+def _loads(raw: str) -> Any:
+    """Decode context JSON; decode errors are ``json.JSONDecodeError`` either way."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
 
 
 def _session_to_dict(state: SessionState) -> Dict[str, Any]:
@@ -45,18 +71,29 @@ class ContextService:
     ) -> None:
         self._redis = redis_crud
         self._ttl = ttl_seconds
+        # session_id -> serialized context awaiting flush_contexts().
+        self._pending: Dict[str, str | bytes] = {}
 
     def _key(self, session_id: str) -> str:
         return f"{CONTEXT_KEY_PREFIX}{session_id}"
 
-    async def get_context(self, session_id: str) -> SessionState | None:
-        """Load context for session_id from Redis. Returns None if missing or on error."""
+    async def get_context(
+        self, session_id: str, refresh_ttl: bool = False
+    ) -> SessionState | None:
+        """Load context for session_id from Redis. Returns None if missing or on error.
+
+        With refresh_ttl the key's TTL is reset in the same round trip, so
+        sessions that are only read stay alive as long as written ones.
+        """
         key = self._key(session_id)
-        raw = await self._redis.get(key)
+        if refresh_ttl:
+            raw = await self._redis.get_and_refresh(key, self._ttl)
+        else:
+            raw = await self._redis.get(key)
         if raw is None:
             return None
         try:
-            data = json.loads(raw)
+            data = _loads(raw)
             return _dict_to_session(data)
         except (json.JSONDecodeError, KeyError, TypeError) as e:
             logger.warning("Invalid context data for %s: %s", session_id, e)
@@ -67,12 +104,42 @@ class ContextService:
         key = self._key(session_id)
         data = _session_to_dict(state)
         try:
-            payload = json.dumps(data)
+            payload = _dumps(data)
         except (TypeError, ValueError) as e:
             logger.warning("Context serialization failed for %s: %s", session_id, e)
             return False
         return await self._redis.set(key, payload, ttl_seconds=self._ttl)
 
+    def stage_context(self, session_id: str, state: SessionState) -> bool:
+        """Queue context for session_id to be written by the next flush_contexts().
+
+        Staging the same session again replaces its pending write. Returns
+        False if the state cannot be serialized.
+        """
+        try:
+            self._pending[session_id] = _dumps(_session_to_dict(state))
+        except (TypeError, ValueError) as e:
+            logger.warning("Context serialization failed for %s: %s", session_id, e)
+            return False
+        return True
+
+    async def flush_contexts(self) -> bool:
+        """Write all staged contexts with TTL in one pipelined round trip. Returns True on success."""
+        if not self._pending:
+            return True
+        staged = self._pending
+        self._pending = {}
+        items = [
+            (self._key(session_id), payload, self._ttl)
+            for session_id, payload in staged.items()
+        ]
+        ok = await self._redis.pipeline_setex(items)
+        if not ok:
+            # Keep failed writes for the next flush unless restaged meanwhile.
+            for session_id, payload in staged.items():
+                self._pending.setdefault(session_id, payload)
+        return ok
+
     async def delete_context(self, session_id: str) -> bool:
         """Remove context for session_id. Returns True on success."""
         return await self._redis.delete(self._key(session_id))
@@ -92,32 +159,51 @@ def get_context_service() -> ContextService | None:
 
 # Lazy singleton for optional async init (connect to Redis)
 _context_service_instance: ContextService | None = None
+# Monotonic time before which a failed connect is not retried.
+_context_service_retry_at = 0.0
+
+
+def get_cached_context_service() -> ContextService | None:
+    """Return the context service if already connected, without any I/O."""
+    return _context_service_instance
 
 
 async def get_context_service_async() -> ContextService | None:
-    """Return the context service after ensuring Redis is connected. Cached."""
-    global _context_service_instance
+    """Return the context service after ensuring Redis is connected. Cached.
+
+    A failed connect is cached too: for CONNECT_RETRY_SECONDS afterwards
+    this returns None without contacting Redis.
+    """
+    global _context_service_instance, _context_service_retry_at
+    if _context_service_instance is not None:
+        return _context_service_instance
+    if time.monotonic() < _context_service_retry_at:
+        return None
     redis_crud = get_redis_crud_service()
     if redis_crud is None:
         return None
-    if _context_service_instance is None:
-        try:
-            await redis_crud.connect()
-            settings = get_settings()
-            _context_service_instance = ContextService(
-                redis_crud=redis_crud,
-                ttl_seconds=settings.context_ttl_seconds,
-            )
-        except (RedisConnectionError, RedisTimeoutError, ConnectionError, TimeoutError) as e:
-            logger.warning("Context service unavailable (Redis): %s", e)
-            return None
+    try:
+        await redis_crud.connect()
+        settings = get_settings()
+        _context_service_instance = ContextService(
+            redis_crud=redis_crud,
+            ttl_seconds=settings.context_ttl_seconds,
+        )
+    except (RedisConnectionError, RedisTimeoutError, ConnectionError, TimeoutError) as e:
+        logger.warning("Context service unavailable (Redis): %s", e)
+        _context_service_retry_at = time.monotonic() + CONNECT_RETRY_SECONDS
+        return None
     return _context_service_instance
 
 
 async def close_context_service() -> None:
-    """Close the Redis connection used by the context service. Idempotent."""
+    """Flush staged contexts and drop the context service. Idempotent.
+
+    The Redis service is shared (see get_redis_crud_service) and closed
+    once by close_redis_crud_service.
+    """
     global _context_service_instance
     if _context_service_instance is not None:
-        await _context_service_instance._redis.close()
+        await _context_service_instance.flush_contexts()
         _context_service_instance = None
         logger.debug("Context service (Redis) closed")
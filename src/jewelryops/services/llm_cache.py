@@ -0,0 +1,133 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from ..settings import get_settings
+from .redis import RedisCrudService, get_redis_crud_service
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_KEY_PREFIX = "llm:"
+LOCAL_CACHE_SIZE = 256
+
+
+def llm_cache_key(
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: float,
+) -> str | None:
+    """Return a stable key for a deterministic chat completion, else None.
+
+    Only temperature-0 requests are cacheable: any sampling makes replies
+    differ between identical requests.
+    """
+    if temperature > 0:
+        return None
+    payload = json.dumps(
+        {"model": model, "messages": messages}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Caches deterministic LLM replies in an in-process LRU and, optionally, Redis with TTL."""
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        redis_crud: RedisCrudService | None = None,
+        max_entries: int = LOCAL_CACHE_SIZE,
+    ) -> None:
+        self._ttl = ttl_seconds
+        self._redis = redis_crud
+        self._redis_ready = False
+        self._max_entries = max_entries
+        # key -> (monotonic expiry, reply), least recently used first.
+        self._local: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+
+    def _redis_key(self, key: str) -> str:
+        return f"{LLM_CACHE_KEY_PREFIX}{key}"
+
+    def get_local(self, key: str) -> str | None:
+        """Return the in-process cached reply for key, or None if missing or expired."""
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return value
+
+    def set_local(self, key: str, value: str) -> None:
+        """Store a reply in the in-process LRU, evicting the oldest beyond max_entries."""
+        self._local[key] = (time.monotonic() + self._ttl, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self._max_entries:
+            self._local.popitem(last=False)
+
+    async def _ensure_redis(self) -> RedisCrudService | None:
+        """Connect the Redis backend on first use; drop it if unreachable."""
+        if self._redis is None or self._redis_ready:
+            return self._redis
+        try:
+            await self._redis.connect()
+            self._redis_ready = True
+        except (RedisConnectionError, RedisTimeoutError, ConnectionError, TimeoutError) as e:
+            logger.warning("LLM cache Redis backend unavailable: %s", e)
+            self._redis = None
+        return self._redis
+
+    async def get(self, key: str) -> str | None:
+        """Return the cached reply for key from memory, then Redis. None on miss."""
+        value = self.get_local(key)
+        if value is not None:
+            return value
+        redis_crud = await self._ensure_redis()
+        if redis_crud is None:
+            return None
+        value = await redis_crud.get(self._redis_key(key))
+        if value is not None:
+            self.set_local(key, value)
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        """Store a reply in memory and, when available, in Redis with TTL."""
+        self.set_local(key, value)
+        redis_crud = await self._ensure_redis()
+        if redis_crud is not None:
+            await redis_crud.set(self._redis_key(key), value, ttl_seconds=self._ttl)
+
+# Lazy singleton shared by the tool functions
+_llm_cache_instance: LLMCache | None = None
+
+
+def get_llm_cache() -> LLMCache:
+    """Return the process-wide LLM cache (Redis-backed when redis_url is set)."""
+    global _llm_cache_instance
+    if _llm_cache_instance is None:
+        settings = get_settings()
+        _llm_cache_instance = LLMCache(
+            ttl_seconds=settings.llm_cache_ttl_seconds,
+            redis_crud=get_redis_crud_service(),
+        )
+    return _llm_cache_instance
+
+
+def close_llm_cache() -> None:
+    """Drop the LLM cache. Idempotent.
+
+    The Redis service is shared (see get_redis_crud_service) and closed
+    once by close_redis_crud_service.
+    """
+    global _llm_cache_instance
+    if _llm_cache_instance is not None:
+        _llm_cache_instance = None
+        logger.debug("LLM cache closed")
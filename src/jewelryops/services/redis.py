@@ -1,7 +1,9 @@
+from __future__ import annotations
+
 import logging
-from typing import Any
+from functools import lru_cache
 
-from redis.asyncio import Redis
+from redis.asyncio import ConnectionPool, Redis
 from redis.exceptions import ConnectionError as RedisConnectionError
 from redis.exceptions import TimeoutError as RedisTimeoutError
 
@@ -13,19 +15,29 @@ logger = logging.getLogger(__name__)
 class RedisCrudService:
     """Async CRUD operations against a Redis instance."""
 
-    def __init__(self, url: str) -> None:
-        """Create a Redis client for the given URL (e.g. redis://localhost:6379/0)."""
+    def __init__(self, url: str, max_connections: int = 32) -> None:
+        """Create a Redis client for the given URL (e.g. redis://localhost:6379/0).
+
+        Args:
+            url: Redis connection URL.
+            max_connections: Upper bound on pooled connections shared by all callers.
+        """
         self._url = url
-        self._client: Redis[bytes] | None = None
+        self._max_connections = max_connections
+        self._client: Redis[str] | None = None
 
     async def connect(self) -> None:
         """Establish connection to Redis. Idempotent."""
         if self._client is not None:
             return
-        self._client = Redis.from_url(
+        pool = ConnectionPool.from_url(
             self._url,
             decode_responses=True,
+            max_connections=self._max_connections,
+            socket_keepalive=True,
         )
+        # from_pool hands pool ownership to the client, so aclose() disconnects it.
+        self._client = Redis.from_pool(pool)
         try:
             await self._client.ping()
             logger.info("Redis connection established: %s", self._url.split("@")[-1])
@@ -43,7 +55,7 @@ class RedisCrudService:
             logger.debug("Redis connection closed")
 
     @property
-    def client(self) -> Redis[Any] | None:
+    def client(self) -> Redis[str] | None:
         """Return the underlying Redis client, or None if not connected."""
         return self._client
 
@@ -52,19 +64,31 @@ class RedisCrudService:
         if self._client is None:
             return None
         try:
-            value = await self._client.get(key)
-            return value if value is None else str(value)
+            return await self._client.get(key)
         except (RedisConnectionError, RedisTimeoutError) as e:
             logger.warning("Redis get %s failed: %s", key, e)
             return None
 
+    async def get_and_refresh(self, key: str, ttl_seconds: int) -> str | None:
+        """Return the value for key and reset its TTL in the same round trip (GETEX).
+
+        Returns None if missing or on error.
+        """
+        if self._client is None:
+            return None
+        try:
+            return await self._client.getex(key, ex=ttl_seconds)
+        except (RedisConnectionError, RedisTimeoutError) as e:
+            logger.warning("Redis getex %s failed: %s", key, e)
+            return None
+
     async def set(
         self,
         key: str,
-        value: str,
+        value: str | bytes,
         ttl_seconds: int | None = None,
     ) -> bool:
-        """Set key to value. If ttl_seconds is set, the key will expire. Returns True on success."""
+        """Set key to value (bytes are sent as is). If ttl_seconds is set, the key will expire. Returns True on success."""
         if self._client is None:
             return False
         try:
@@ -77,6 +101,43 @@ class RedisCrudService:
             logger.warning("Redis set %s failed: %s", key, e)
             return False
 
+    async def pipeline_setex(self, items: list[tuple[str, str | bytes, int]]) -> bool:
+        """Set several (key, value, ttl_seconds) entries in one round trip. Returns True on success."""
+        if self._client is None:
+            return False
+        if not items:
+            return True
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for key, value, ttl_seconds in items:
+                    pipe.setex(key, ttl_seconds, value)
+                await pipe.execute()
+            return True
+        except (RedisConnectionError, RedisTimeoutError) as e:
+            logger.warning("Redis pipelined setex of %d keys failed: %s", len(items), e)
+            return False
+
+    async def set_many(
+        self,
+        items: dict[str, str | bytes],
+        ttl_seconds: int | None = None,
+    ) -> bool:
+        """Set several keys in one round trip, with a shared TTL if ttl_seconds is set. Returns True on success."""
+        if ttl_seconds is not None and ttl_seconds > 0:
+            return await self.pipeline_setex(
+                [(key, value, ttl_seconds) for key, value in items.items()]
+            )
+        if self._client is None:
+            return False
+        if not items:
+            return True
+        try:
+            await self._client.mset(items)
+            return True
+        except (RedisConnectionError, RedisTimeoutError) as e:
+            logger.warning("Redis mset of %d keys failed: %s", len(items), e)
+            return False
+
     async def delete(self, key: str) -> bool:
         """Delete key. Returns True if key was deleted or did not exist."""
         if self._client is None:
@@ -100,9 +161,28 @@ class RedisCrudService:
             return False
 
 
+@lru_cache(maxsize=1)
 def get_redis_crud_service() -> RedisCrudService | None:
-    """Return a Redis CRUD service if redis_url is configured, else None."""
+    """Return the shared Redis CRUD service if redis_url is configured, else None.
+
+    The result (including None) is cached, so every caller shares one
+    connection pool; call ``get_redis_crud_service.cache_clear()`` after
+    changing settings.
+    """
     settings = get_settings()
-    if not settings.redis_url or not settings.redis_url.strip():
+    url = (settings.redis_url or "").strip()
+    if not url:
         return None
-    return RedisCrudService(settings.redis_url.strip())
+    return RedisCrudService(url, max_connections=settings.redis_max_connections)
+
+
+async def close_redis_crud_service() -> None:
+    """Close the shared Redis CRUD service, if one was created. Idempotent.
+
+    Call once at shutdown, after every user of the service is done with it.
+    """
+    if get_redis_crud_service.cache_info().currsize:
+        redis_crud = get_redis_crud_service()
+        if redis_crud is not None:
+            await redis_crud.close()
+        get_redis_crud_service.cache_clear()
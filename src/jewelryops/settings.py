@@ -1,8 +1,57 @@
+from functools import lru_cache
 from pathlib import Path
-from typing import Literal
+from typing import Final, Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Default prompts live at module scope; each can still be overridden from the
+# environment through the matching Settings field.
+_AGENT_SYSTEM_PROMPT: Final[str] = (
+    "You are a senior support specialist at JewelryOps, a luxury jewelry "
+    "retailer.\n\n"
+    " Your Role\n"
+    "You investigate customer service, order fulfillment, and inventory issues.\n"
+    "You make multi-step investigations using available tools.\n"
+    "You apply business judgment, policies, and customer context to propose actions.\n"
+    "You always maintain clarity about what you've found and your reasoning.\n\n"
+    " Analysis process: "
+    " - Look at emails, notes for any open questions or issues.\n"
+    " - Check customer and order details for relevant context.\n"
+    " - Use tools to investigate and gather more information as needed.\n"
+    " - Summarize your findings and propose next steps or resolutions.\n\n"
+    " - Write responses to people if nesessary.\n\n"
+    "Keep your answers precise and professional."
+)
+
+_EXTRACT_ENTITIES_SYSTEM_PROMPT: Final[str] = (
+    "You are an entity extraction assistant. Extract customer IDs (cust_XXX), "
+    "order IDs (ORD-XXXX), and SKU codes (WORD-XXX) from the given text. "
+    "Return a JSON object with keys: customer_ids, order_ids, skus (all arrays). "
+    "Only include IDs that are clearly present in the text."
+)
+
+_EXTRACT_ENTITIES_BATCH_SYSTEM_PROMPT: Final[str] = (
+    "You are an entity extraction assistant. Extract customer IDs (cust_XXX), "
+    "order IDs (ORD-XXXX), and SKU codes (WORD-XXX) from each numbered item. "
+    "Return a top-level JSON array with one object per item, in order; each "
+    "object has keys customer_ids, order_ids, skus (all arrays). "
+    "Only include IDs that are clearly present in the item."
+)
+
+_SUMMARIZE_STATE_SYSTEM_PROMPT: Final[str] = (
+    "You are a helpful assistant that creates concise summaries of support "
+    "investigations. Analyze the conversation history and create a brief, clear "
+    "summary of the investigation state. Return JSON with keys: summary (string), "
+    "key_findings (array), open_items (array)."
+)
+
+_CHECK_REQUIRES_CONFIRMATION_SYSTEM_PROMPT: Final[str] = (
+    "You are a risk assessment assistant for support actions. Determine if an "
+    "action requires explicit user confirmation. Return JSON with keys: "
+    "requires_confirmation (bool), reason (string). Actions that modify data, "
+    "cancel orders, refund money, or delete records typically require confirmation."
+)
+
 
 class Settings(BaseSettings):
     """Application configuration."""
@@ -15,6 +64,22 @@ class Settings(BaseSettings):
     model: str = "gpt-4o-mini"
     temperature: float = 0.0
     max_iterations: int = 25
+    # Offer the model one-line tool summaries plus a get_tool_schema meta tool
+    # instead of every full schema up front (smaller prompts, extra round trip).
+    lazy_tool_schemas: bool = False
+    # In-memory session bounds: least recently used sessions are evicted, and
+    # each session keeps only its newest messages.
+    max_sessions: int = 10_000
+    max_session_messages: int = 50
+    # Approximate token budget (chars / 4) for replayed conversation history.
+    history_token_budget: int = 2000
+    # Upper bound on tool calls from one model turn that run concurrently.
+    tool_max_concurrency: int = 4
+    # Per-turn LRU of read-only tool results (repeated calls skip the round trip).
+    tool_result_cache_size: int = 256
+    # Second completion that turns tool results into prose; when disabled the
+    # reply just names the tools that ran.
+    enable_final_summary: bool = True
     openai_api_key: str | None = None
     openai_base_url: str | None = "https://api.openai.com/v1"
 
@@ -26,43 +91,16 @@ class Settings(BaseSettings):
     cors_origins: str = "*"
 
     redis_url: str | None = None
+    redis_max_connections: int = 32
     context_ttl_seconds: int = 86400  # 24 hours
+    # Lifetime of cached deterministic tool-model replies.
+    llm_cache_ttl_seconds: int = 3600
 
-    agent_system_prompt: str = (
-        "You are a senior support specialist at JewelryOps, a luxury jewelry "
-        "retailer.\n\n"
-        " Your Role\n"
-        "You investigate customer service, order fulfillment, and inventory issues.\n"
-        "You make multi-step investigations using available tools.\n"
-        "You apply business judgment, policies, and customer context to propose actions.\n"
-        "You always maintain clarity about what you've found and your reasoning.\n\n"
-        " Analysis process: "
-        " - Look at emails, notes for any open questions or issues.\n"
-        " - Check customer and order details for relevant context.\n"
-        " - Use tools to investigate and gather more information as needed.\n"
-        " - Summarize your findings and propose next steps or resolutions.\n\n"
-        " - Write responses to people if nesessary.\n\n"
-        "Keep your answers precise and professional."
-    )
-
-    extract_entities_system_prompt: str = (
-        "You are an entity extraction assistant. Extract customer IDs (cust_XXX), "
-        "order IDs (ORD-XXXX), and SKU codes (WORD-XXX) from the given text. "
-        "Return a JSON object with keys: customer_ids, order_ids, skus (all arrays). "
-        "Only include IDs that are clearly present in the text."
-    )
-    summarize_state_system_prompt: str = (
-        "You are a helpful assistant that creates concise summaries of support "
-        "investigations. Analyze the conversation history and create a brief, clear "
-        "summary of the investigation state. Return JSON with keys: summary (string), "
-        "key_findings (array), open_items (array)."
-    )
-    check_requires_confirmation_system_prompt: str = (
-        "You are a risk assessment assistant for support actions. Determine if an "
-        "action requires explicit user confirmation. Return JSON with keys: "
-        "requires_confirmation (bool), reason (string). Actions that modify data, "
-        "cancel orders, refund money, or delete records typically require confirmation."
-    )
+    agent_system_prompt: str = _AGENT_SYSTEM_PROMPT
+    extract_entities_system_prompt: str = _EXTRACT_ENTITIES_SYSTEM_PROMPT
+    extract_entities_batch_system_prompt: str = _EXTRACT_ENTITIES_BATCH_SYSTEM_PROMPT
+    summarize_state_system_prompt: str = _SUMMARIZE_STATE_SYSTEM_PROMPT
+    check_requires_confirmation_system_prompt: str = _CHECK_REQUIRES_CONFIRMATION_SYSTEM_PROMPT
 
     mcp_jewelryops_cmd: str | None = None
     mcp_notion_cmd: str | None = None
@@ -82,6 +120,13 @@ class Settings(BaseSettings):
             "MODEL": "model",
             "TEMPERATURE": "temperature",
             "MAX_ITERATIONS": "max_iterations",
+            "LAZY_TOOL_SCHEMAS": "lazy_tool_schemas",
+            "MAX_SESSIONS": "max_sessions",
+            "MAX_SESSION_MESSAGES": "max_session_messages",
+            "HISTORY_TOKEN_BUDGET": "history_token_budget",
+            "TOOL_MAX_CONCURRENCY": "tool_max_concurrency",
+            "TOOL_RESULT_CACHE_SIZE": "tool_result_cache_size",
+            "ENABLE_FINAL_SUMMARY": "enable_final_summary",
             "OPENAI_API_KEY": "openai_api_key",
             "OPENAI_BASE_URL": "openai_base_url",
             "TOOL_MODEL": "tool_model",
@@ -90,9 +135,12 @@ class Settings(BaseSettings):
             "TOOL_REQUEST_TIMEOUT_SECONDS": "tool_request_timeout_seconds",
             "CORS_ORIGINS": "cors_origins",
             "REDIS_URL": "redis_url",
+            "REDIS_MAX_CONNECTIONS": "redis_max_connections",
             "CONTEXT_TTL_SECONDS": "context_ttl_seconds",
+            "LLM_CACHE_TTL_SECONDS": "llm_cache_ttl_seconds",
             "AGENT_SYSTEM_PROMPT": "agent_system_prompt",
             "EXTRACT_ENTITIES_SYSTEM_PROMPT": "extract_entities_system_prompt",
+            "EXTRACT_ENTITIES_BATCH_SYSTEM_PROMPT": "extract_entities_batch_system_prompt",
             "SUMMARIZE_STATE_SYSTEM_PROMPT": "summarize_state_system_prompt",
             "CHECK_REQUIRES_CONFIRMATION_SYSTEM_PROMPT": "check_requires_confirmation_system_prompt",
             "MCP_JEWELRYOPS_CMD": "mcp_jewelryops_cmd",
@@ -104,13 +152,12 @@ class Settings(BaseSettings):
     )
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Return the application settings singleton (loaded from env / .env)."""
-    global _SETTINGS
-    try:
-        return _SETTINGS
-    except NameError:
-        _SETTINGS = Settings()
-        return _SETTINGS
+    """Return the application settings singleton (loaded from env / .env).
+
+    Call ``get_settings.cache_clear()`` to reload from the environment.
+    """
+    return Settings()
 
 
@@ -0,0 +1,227 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("autogen")
+pytest.importorskip("mcp")
+
+from jewelryops.agent.agent import JewelryOpsAgentService, SessionState, ToolResultCache
+
+
+def _service(calls: List[str]) -> JewelryOpsAgentService:
+    """Agent service whose tool dispatch just records calls."""
+    service = JewelryOpsAgentService()
+
+    async def run_tool(name: str, arguments: Dict[str, Any]) -> str:
+        calls.append(name)
+        return f"{name}#{len(calls)}"
+
+    service._run_tool = run_tool
+    return service
+
+
+@pytest.mark.asyncio
+async def test_tool_cache_replays_reads_until_a_write() -> None:
+    """Repeated reads hit the cache (argument order ignored); a write clears it."""
+    calls: List[str] = []
+    service = _service(calls)
+    cache = ToolResultCache()
+    first = await service.execute_tool_async("get_order", {"a": 1, "b": 2}, cache)
+    assert await service.execute_tool_async("get_order", {"b": 2, "a": 1}, cache) == first
+    await service.execute_tool_async("add_note", {}, cache)
+    assert not cache.entries
+    assert await service.execute_tool_async("get_order", {"a": 1, "b": 2}, cache) != first
+    assert calls == ["get_order", "add_note", "get_order"]
+
+
+@pytest.mark.asyncio
+async def test_tool_cache_skips_reads_that_overlap_a_write() -> None:
+    """A read that started before a write finished is not stored."""
+    service = JewelryOpsAgentService()
+    read_started = asyncio.Event()
+    release_read = asyncio.Event()
+
+    async def run_tool(name: str, arguments: Dict[str, Any]) -> str:
+        if name == "get_order":
+            read_started.set()
+            await release_read.wait()
+        return name
+
+    service._run_tool = run_tool
+    cache = ToolResultCache()
+    read = asyncio.create_task(service.execute_tool_async("get_order", {}, cache))
+    await read_started.wait()
+    await service.execute_tool_async("add_note", {}, cache)
+    release_read.set()
+    assert await read == "get_order"
+    assert not cache.entries
+
+
+@pytest.mark.asyncio
+async def test_tool_cache_shares_in_flight_duplicate_reads() -> None:
+    """Concurrent identical reads await a single dispatch."""
+    calls: List[str] = []
+    service = _service(calls)
+    release = asyncio.Event()
+
+    async def run_tool(name: str, arguments: Dict[str, Any]) -> str:
+        calls.append(name)
+        await release.wait()
+        return name
+
+    service._run_tool = run_tool
+    cache = ToolResultCache()
+    reads = [
+        asyncio.create_task(service.execute_tool_async("get_order", {"id": 1}, cache))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*reads) == ["get_order"] * 3
+    assert calls == ["get_order"]
+    assert not cache.pending
+
+
+@pytest.mark.asyncio
+async def test_tool_cache_read_after_write_does_not_join_earlier_read() -> None:
+    """A read issued after a write dispatches again instead of joining a pre-write call."""
+    calls: List[str] = []
+    release = asyncio.Event()
+
+    async def run_tool(name: str, arguments: Dict[str, Any]) -> str:
+        calls.append(name)
+        count = len(calls)
+        if count == 1:
+            started.set()
+            await release.wait()
+        return f"{name}#{count}"
+
+    started = asyncio.Event()
+    service = JewelryOpsAgentService()
+    service._run_tool = run_tool
+    cache = ToolResultCache()
+    before = asyncio.create_task(service.execute_tool_async("get_order", {}, cache))
+    await started.wait()
+    await service.execute_tool_async("add_note", {}, cache)
+    after = await service.execute_tool_async("get_order", {}, cache)
+    release.set()
+    assert await before == "get_order#1"
+    assert after == "get_order#3"
+    assert calls == ["get_order", "add_note", "get_order"]
+
+
+@pytest.mark.asyncio
+async def test_execute_tool_without_cache_always_runs() -> None:
+    """Without a cache every call is dispatched."""
+    calls: List[str] = []
+    service = _service(calls)
+    await service.execute_tool_async("get_order", {}, None)
+    await service.execute_tool_async("get_order", {}, None)
+    assert calls == ["get_order", "get_order"]
+
+
+class _FakeCompletions:
+    """Streams scripted tool calls, optionally raising after they are sent."""
+
+    def __init__(self, tool_calls: List[Tuple[str, Dict[str, Any]]], fail: bool = False) -> None:
+        self._tool_calls = tool_calls
+        self._fail = fail
+
+    async def create(self, **kwargs: Any) -> AsyncIterator[Any]:
+        if not kwargs.get("tools"):
+            return self._text("done")
+        return self._calls()
+
+    async def _calls(self) -> AsyncIterator[Any]:
+        for index, (name, arguments) in enumerate(self._tool_calls):
+            function = SimpleNamespace(name=name, arguments=json.dumps(arguments))
+            delta = SimpleNamespace(
+                content=None,
+                tool_calls=[SimpleNamespace(index=index, id=f"call{index}", function=function)],
+            )
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+            await asyncio.sleep(0.01)
+        if self._fail:
+            raise ConnectionError("stream dropped")
+
+    async def _text(self, text: str) -> AsyncIterator[Any]:
+        delta = SimpleNamespace(content=text, tool_calls=None)
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+def _streaming_service(
+    tool_calls: List[Tuple[str, Dict[str, Any]]],
+    run_tool: Any,
+    fail: bool = False,
+) -> JewelryOpsAgentService:
+    """Agent service driven by a scripted model stream and a fake tool runner."""
+    service = JewelryOpsAgentService()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions(tool_calls, fail)))
+    service._get_client = lambda settings_obj: client
+
+    async def build_agent_async(session: SessionState) -> Any:
+        return SimpleNamespace(system_message="system")
+
+    service.build_agent_async = build_agent_async
+    service._run_tool = run_tool
+    return service
+
+
+@pytest.mark.asyncio
+async def test_writes_do_not_start_before_the_stream_completes() -> None:
+    """A write emitted before the stream fails is never executed."""
+    calls: List[str] = []
+
+    async def run_tool(name: str, arguments: Dict[str, Any]) -> str:
+        calls.append(name)
+        return name
+
+    service = _streaming_service(
+        [("add_note", {"text": "x"}), ("get_order", {"id": 1})], run_tool, fail=True
+    )
+    output = "".join([chunk async for chunk in service.run_agent_stream("s-fail", "hi")])
+    assert "stream dropped" in output
+    assert "add_note" not in calls
+
+
+@pytest.mark.asyncio
+async def test_writes_are_ordered_barriers() -> None:
+    """Reads around a write never overlap it; reads between writes may overlap."""
+    events: List[str] = []
+
+    async def run_tool(name: str, arguments: Dict[str, Any]) -> str:
+        events.append(f"start {name}")
+        await asyncio.sleep(0.005 if name.startswith("add") else 0.03)
+        events.append(f"end {name}")
+        return name
+
+    service = _streaming_service(
+        [("get_a", {}), ("add_b", {}), ("get_c", {}), ("get_d", {})], run_tool
+    )
+    output = "".join([chunk async for chunk in service.run_agent_stream("s-order", "hi")])
+    assert "1. get_a" in output and "4. get_d" in output
+    assert events.index("end get_a") < events.index("start add_b")
+    assert events.index("end add_b") < events.index("start get_c")
+    assert events.index("start get_d") < events.index("end get_c")
+
+
+@pytest.mark.asyncio
+async def test_duplicate_reads_in_one_round_dispatch_once() -> None:
+    """Identical reads streamed in one round share a dispatch, early start included."""
+    calls: List[str] = []
+
+    async def run_tool(name: str, arguments: Dict[str, Any]) -> str:
+        calls.append(name)
+        await asyncio.sleep(0.05)
+        return name
+
+    service = _streaming_service(
+        [("get_order", {"id": 1}), ("get_order", {"id": 1}), ("get_order", {"id": 1})], run_tool
+    )
+    output = "".join([chunk async for chunk in service.run_agent_stream("s-dup", "hi")])
+    assert "done" in output
+    assert calls == ["get_order"]
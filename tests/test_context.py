@@ -1,3 +1,4 @@
+import json
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -12,8 +13,10 @@ def mock_redis_crud() -> MagicMock:
     """Mock Redis CRUD with async get/set/delete."""
     m = MagicMock(spec=RedisCrudService)
     m.get = AsyncMock(return_value=None)
+    m.get_and_refresh = AsyncMock(return_value=None)
     m.set = AsyncMock(return_value=True)
     m.delete = AsyncMock(return_value=True)
+    m.pipeline_setex = AsyncMock(return_value=True)
     return m
 
 
@@ -53,6 +56,17 @@ async def test_get_context_present(context_service: ContextService) -> None:
     assert result.tool_calls_count == 2
 
 
+@pytest.mark.asyncio
+async def test_get_context_refresh_ttl(context_service: ContextService) -> None:
+    """get_context(refresh_ttl=True) reads and resets the TTL in one call."""
+    context_service._redis.get_and_refresh.return_value = json.dumps({"session_id": "s1"})
+    result = await context_service.get_context("s1", refresh_ttl=True)
+    assert result is not None
+    assert result.session_id == "s1"
+    context_service._redis.get_and_refresh.assert_called_once_with("context:s1", 3600)
+    context_service._redis.get.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_get_context_invalid_json(context_service: ContextService) -> None:
     """get_context returns None when stored value is invalid JSON."""
@@ -75,7 +89,7 @@ async def test_save_context(context_service: ContextService) -> None:
     context_service._redis.set.assert_called_once()
     call_args = context_service._redis.set.call_args
     assert call_args[0][0] == "context:s1"
-    assert "s1" in call_args[0][1]
+    assert json.loads(call_args[0][1])["session_id"] == "s1"
     assert call_args[1]["ttl_seconds"] == 3600
 
 
@@ -85,3 +99,85 @@ async def test_delete_context(context_service: ContextService) -> None:
     ok = await context_service.delete_context("session-x")
     assert ok is True
     context_service._redis.delete.assert_called_once_with("context:session-x")
+
+
+@pytest.mark.asyncio
+async def test_flush_contexts_pipelines_staged_writes(context_service: ContextService) -> None:
+    """Staged contexts are written in one pipelined call; restaging replaces."""
+    context_service.stage_context("s1", SessionState(session_id="s1"))
+    context_service.stage_context("s2", SessionState(session_id="s2"))
+    context_service.stage_context("s1", SessionState(session_id="s1", tool_calls_count=3))
+    ok = await context_service.flush_contexts()
+    assert ok is True
+    context_service._redis.pipeline_setex.assert_called_once()
+    items = context_service._redis.pipeline_setex.call_args[0][0]
+    assert [(key, ttl) for key, _, ttl in items] == [("context:s1", 3600), ("context:s2", 3600)]
+    assert json.loads(items[0][1])["tool_calls_count"] == 3
+    assert await context_service.flush_contexts() is True
+    context_service._redis.pipeline_setex.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_close_context_service_flushes_staged_writes(context_service: ContextService) -> None:
+    """Shutdown writes pending contexts and leaves the shared Redis client open."""
+    from jewelryops.services import context_service as module
+
+    context_service._redis.close = AsyncMock(return_value=None)
+    context_service.stage_context("s1", SessionState(session_id="s1"))
+    with patch.object(module, "_context_service_instance", context_service):
+        await module.close_context_service()
+        assert module._context_service_instance is None
+    context_service._redis.pipeline_setex.assert_called_once()
+    context_service._redis.close.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_context_service_async_reuses_instance(context_service: ContextService) -> None:
+    """Once connected, the cached service is returned without rebuilding Redis."""
+    from jewelryops.services import context_service as module
+
+    with (
+        patch.object(module, "_context_service_instance", context_service),
+        patch.object(module, "get_redis_crud_service") as get_redis,
+    ):
+        assert await module.get_context_service_async() is context_service
+        get_redis.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_flush_contexts_keeps_failed_writes(context_service: ContextService) -> None:
+    """A failed flush keeps its contexts for the next one; newer stages win."""
+    context_service._redis.pipeline_setex.return_value = False
+    context_service.stage_context("s1", SessionState(session_id="s1"))
+    context_service.stage_context("s2", SessionState(session_id="s2"))
+    assert await context_service.flush_contexts() is False
+    context_service.stage_context("s1", SessionState(session_id="s1", tool_calls_count=5))
+    context_service._redis.pipeline_setex.return_value = True
+    assert await context_service.flush_contexts() is True
+    items = context_service._redis.pipeline_setex.call_args[0][0]
+    payloads = {key: json.loads(payload) for key, payload, _ in items}
+    assert set(payloads) == {"context:s1", "context:s2"}
+    assert payloads["context:s1"]["tool_calls_count"] == 5
+    assert await context_service.flush_contexts() is True
+    assert context_service._redis.pipeline_setex.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_context_service_async_backs_off_after_failed_connect(
+    mock_redis_crud: MagicMock,
+) -> None:
+    """A failed connect is not retried until CONNECT_RETRY_SECONDS have passed."""
+    from jewelryops.services import context_service as module
+
+    mock_redis_crud.connect = AsyncMock(side_effect=ConnectionError("down"))
+    with (
+        patch.object(module, "_context_service_instance", None),
+        patch.object(module, "_context_service_retry_at", 0.0),
+        patch.object(module, "get_redis_crud_service", return_value=mock_redis_crud),
+    ):
+        assert await module.get_context_service_async() is None
+        assert await module.get_context_service_async() is None
+        mock_redis_crud.connect.assert_called_once()
+        module._context_service_retry_at = 0.0
+        assert await module.get_context_service_async() is None
+        assert mock_redis_crud.connect.call_count == 2
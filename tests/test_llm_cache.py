@@ -0,0 +1,89 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from jewelryops.services import llm_cache as llm_cache_module
+from jewelryops.services.llm_cache import LLMCache, llm_cache_key
+from jewelryops.services.redis import RedisCrudService
+
+
+@pytest.fixture
+def mock_redis_crud() -> MagicMock:
+    """Mock Redis CRUD with async connect/get/set."""
+    m = MagicMock(spec=RedisCrudService)
+    m.connect = AsyncMock(return_value=None)
+    m.get = AsyncMock(return_value=None)
+    m.set = AsyncMock(return_value=True)
+    m.close = AsyncMock(return_value=None)
+    return m
+
+
+def test_llm_cache_key_deterministic_only() -> None:
+    """llm_cache_key is stable for temperature 0 and None when sampling."""
+    messages = [{"role": "user", "content": "hi"}]
+    key = llm_cache_key("gpt-4o-mini", messages, 0.0)
+    assert key == llm_cache_key("gpt-4o-mini", list(messages), 0.0)
+    assert key != llm_cache_key("gpt-4o", messages, 0.0)
+    assert llm_cache_key("gpt-4o-mini", messages, 0.7) is None
+
+
+def test_local_cache_evicts_least_recently_used() -> None:
+    """The in-process LRU keeps at most max_entries replies."""
+    cache = LLMCache(ttl_seconds=60, max_entries=2)
+    cache.set_local("a", "1")
+    cache.set_local("b", "2")
+    assert cache.get_local("a") == "1"
+    cache.set_local("c", "3")
+    assert cache.get_local("b") is None
+    assert cache.get_local("a") == "1"
+    assert cache.get_local("c") == "3"
+
+
+def test_local_cache_expires() -> None:
+    """Entries older than the TTL are treated as misses."""
+    cache = LLMCache(ttl_seconds=0)
+    cache.set_local("a", "1")
+    assert cache.get_local("a") is None
+
+
+@pytest.mark.asyncio
+async def test_get_falls_back_to_redis(mock_redis_crud: MagicMock) -> None:
+    """get reads through to Redis on a local miss and keeps the value locally."""
+    mock_redis_crud.get.return_value = "cached"
+    cache = LLMCache(ttl_seconds=60, redis_crud=mock_redis_crud)
+    assert await cache.get("k") == "cached"
+    assert await cache.get("k") == "cached"
+    mock_redis_crud.connect.assert_called_once()
+    mock_redis_crud.get.assert_called_once_with("llm:k")
+
+
+@pytest.mark.asyncio
+async def test_set_writes_redis_with_ttl(mock_redis_crud: MagicMock) -> None:
+    """set stores locally and in Redis with the cache TTL."""
+    cache = LLMCache(ttl_seconds=120, redis_crud=mock_redis_crud)
+    await cache.set("k", "v")
+    assert cache.get_local("k") == "v"
+    mock_redis_crud.set.assert_called_once_with("llm:k", "v", ttl_seconds=120)
+
+
+@pytest.mark.asyncio
+async def test_unreachable_redis_is_dropped(mock_redis_crud: MagicMock) -> None:
+    """A failed connect disables the Redis backend instead of raising."""
+    mock_redis_crud.connect.side_effect = ConnectionError("down")
+    cache = LLMCache(ttl_seconds=60, redis_crud=mock_redis_crud)
+    assert await cache.get("k") is None
+    await cache.set("k", "v")
+    assert await cache.get("k") == "v"
+    mock_redis_crud.connect.assert_called_once()
+    mock_redis_crud.set.assert_not_called()
+
+
+def test_get_llm_cache_uses_its_own_ttl() -> None:
+    """The shared cache takes llm_cache_ttl_seconds, not the context TTL."""
+    settings = MagicMock(llm_cache_ttl_seconds=600, context_ttl_seconds=86400)
+    with (
+        patch.object(llm_cache_module, "_llm_cache_instance", None),
+        patch.object(llm_cache_module, "get_settings", return_value=settings),
+        patch.object(llm_cache_module, "get_redis_crud_service", return_value=None),
+    ):
+        assert llm_cache_module.get_llm_cache()._ttl == 600
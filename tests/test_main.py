@@ -0,0 +1,72 @@
+import asyncio
+from typing import AsyncIterator, List
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("openai")
+pytest.importorskip("autogen")
+pytest.importorskip("mcp")
+
+from jewelryops.main import _coalesce_tokens
+
+
+async def _tokens(*items: str | float) -> AsyncIterator[str]:
+    """Yield string items as tokens; a float item pauses for that many seconds."""
+    for item in items:
+        if isinstance(item, float):
+            await asyncio.sleep(item)
+        else:
+            yield item
+
+
+async def _collect(tokens: AsyncIterator[str], **kwargs: float) -> List[str]:
+    return [chunk async for chunk in _coalesce_tokens(tokens, **kwargs)]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_flushes_when_the_window_closes() -> None:
+    """Tokens arriving within the window share a frame; a stall flushes it."""
+    chunks = await _collect(_tokens("a", "b", 0.05, "c"), window=0.01, max_tokens=8)
+    assert chunks == ["ab", "c"]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_flushes_at_max_tokens() -> None:
+    """A frame never holds more than max_tokens tokens."""
+    chunks = await _collect(_tokens("a", "b", "c", "d", "e"), window=1.0, max_tokens=2)
+    assert chunks == ["ab", "cd", "e"]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_flushes_buffer_before_source_error() -> None:
+    """Tokens already received are delivered before the source's error."""
+
+    async def failing() -> AsyncIterator[str]:
+        yield "a"
+        raise ConnectionError("lost")
+
+    received: List[str] = []
+    with pytest.raises(ConnectionError):
+        async for chunk in _coalesce_tokens(failing(), window=1.0, max_tokens=8):
+            received.append(chunk)
+    assert received == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_closes_the_source_when_closed() -> None:
+    """Closing the coalescer (e.g. on disconnect) closes the source generator."""
+    closed = asyncio.Event()
+
+    async def endless() -> AsyncIterator[str]:
+        try:
+            while True:
+                yield "t"
+                await asyncio.sleep(0.01)
+        finally:
+            closed.set()
+
+    coalesced = _coalesce_tokens(endless(), window=0.001, max_tokens=1)
+    assert await anext(coalesced) == "t"
+    await coalesced.aclose()
+    assert closed.is_set()
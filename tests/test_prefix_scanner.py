@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "client"))
+
+from _prefix_scanner import PrefixScanner  # noqa: E402
+
+
+def _stream(chunks: list[str]) -> str:
+    """Feed chunks the way the client does and return the rendered text."""
+    scanner = PrefixScanner()
+    in_prefix = True
+    out: list[str] = []
+    for chunk in chunks:
+        if in_prefix:
+            replacement, remaining, in_prefix = scanner.feed(chunk)
+            if not in_prefix:
+                out.append(replacement)
+                out.append(remaining)
+        else:
+            out.append(chunk)
+    if in_prefix:
+        out.append(scanner.pending())
+    return "".join(out)
+
+
+def _splits(text: str) -> list[list[str]]:
+    """Every single split of `text` plus the one-character-per-chunk stream."""
+    cases = [[text[:i], text[i:]] for i in range(len(text) + 1)]
+    cases.append(list(text))
+    return cases
+
+
+_HEADER = '{"tools": ["lookup_order", {"name": "get_stock"}], "thoughts": "check {stock} \\"now\\""}'
+_RENDERED = (
+    "Investigation Steps:\n1. lookup_order\n2. get_stock\n"
+    '\nThoughts:\ncheck {stock} "now"\n\n'
+)
+
+
+@pytest.mark.parametrize("chunks", _splits("  " + _HEADER + "Order is ready."))
+def test_leading_object_replaced_at_every_split(chunks: list[str]) -> None:
+    """Escaped quotes and braces inside strings don't end the prefix early."""
+    assert _stream(chunks) == _RENDERED + "Order is ready."
+
+
+@pytest.mark.parametrize("chunks", _splits('{"meta": {"a": {"b": 1}}, "tools": []}Done'))
+def test_nested_unrecognized_object_omitted(chunks: list[str]) -> None:
+    """Nested braces are tracked and an unrecognized object renders as nothing."""
+    assert _stream(chunks) == "Done"
+
+
+@pytest.mark.parametrize("chunks", _splits(" Hello {not json}"))
+def test_non_json_text_passes_through(chunks: list[str]) -> None:
+    """Text not starting with '{' is emitted unchanged, including leading spaces."""
+    assert _stream(chunks) == " Hello {not json}"
+
+
+@pytest.mark.parametrize("chunks", _splits("{oops} tail"))
+def test_invalid_json_object_passes_through(chunks: list[str]) -> None:
+    """A balanced but unparseable object is emitted raw."""
+    assert _stream(chunks) == "{oops} tail"
+
+
+@pytest.mark.parametrize("chunks", _splits(' {"tools": ["a"], "thoughts": "x}'))
+def test_truncated_prefix_flushed_raw(chunks: list[str]) -> None:
+    """An unterminated prefix is flushed verbatim from pending() at done."""
+    assert _stream(chunks) == ' {"tools": ["a"], "thoughts": "x}'
+
+
+def test_repeated_header_uses_cached_format() -> None:
+    """The same raw header renders identically on later turns."""
+    first = _stream([_HEADER, "a"])
+    second = _stream([_HEADER[:5], _HEADER[5:] + "a"])
+    assert first == second == _RENDERED + "a"
@@ -2,7 +2,11 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from jewelryops.services.redis import RedisCrudService, get_redis_crud_service
+from jewelryops.services.redis import (
+    RedisCrudService,
+    close_redis_crud_service,
+    get_redis_crud_service,
+)
 
 
 @pytest.fixture
@@ -10,8 +14,10 @@ def mock_redis() -> MagicMock:
     """Mock Redis client with async methods."""
     m = MagicMock()
     m.get = AsyncMock(return_value=None)
+    m.getex = AsyncMock(return_value=None)
     m.set = AsyncMock(return_value=True)
     m.setex = AsyncMock(return_value=True)
+    m.mset = AsyncMock(return_value=True)
     m.delete = AsyncMock(return_value=1)
     m.exists = AsyncMock(return_value=0)
     m.ping = AsyncMock(return_value=True)
@@ -32,6 +38,27 @@ async def test_redis_crud_get_missing(mock_redis: MagicMock) -> None:
         mock_redis.get.assert_called_once_with("missing")
 
 
+@pytest.mark.asyncio
+async def test_redis_crud_connect_uses_bounded_keepalive_pool(mock_redis: MagicMock) -> None:
+    """connect builds a bounded keepalive pool and hands it to the client."""
+    with (
+        patch("jewelryops.services.redis.ConnectionPool") as pool_cls,
+        patch("jewelryops.services.redis.Redis") as redis_cls,
+    ):
+        redis_cls.from_pool.return_value = mock_redis
+        svc = RedisCrudService("redis://localhost:6379/0", max_connections=8)
+        await svc.connect()
+        pool_cls.from_url.assert_called_once_with(
+            "redis://localhost:6379/0",
+            decode_responses=True,
+            max_connections=8,
+            socket_keepalive=True,
+        )
+        redis_cls.from_pool.assert_called_once_with(pool_cls.from_url.return_value)
+        assert svc.client is mock_redis
+        mock_redis.ping.assert_awaited_once()
+
+
 @pytest.mark.asyncio
 async def test_redis_crud_get_present(mock_redis: MagicMock) -> None:
     """get returns string value when key exists."""
@@ -42,6 +69,17 @@ async def test_redis_crud_get_present(mock_redis: MagicMock) -> None:
     assert val == "stored_value"
 
 
+@pytest.mark.asyncio
+async def test_redis_crud_get_and_refresh(mock_redis: MagicMock) -> None:
+    """get_and_refresh reads the value and resets its TTL with one GETEX."""
+    mock_redis.getex.return_value = "stored_value"
+    svc = RedisCrudService("redis://localhost:6379/0")
+    svc._client = mock_redis
+    assert await svc.get_and_refresh("key", 60) == "stored_value"
+    mock_redis.getex.assert_called_once_with("key", ex=60)
+    mock_redis.get.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_redis_crud_set_no_ttl(mock_redis: MagicMock) -> None:
     """set without ttl calls set()."""
@@ -97,16 +135,94 @@ async def test_redis_crud_get_when_not_connected() -> None:
 def test_get_redis_crud_service_returns_none_when_no_url() -> None:
     """get_redis_crud_service returns None when redis_url is not set."""
     with patch("jewelryops.services.redis.get_settings") as get_settings:
+        get_redis_crud_service.cache_clear()
         get_settings.return_value = MagicMock(redis_url=None)
         assert get_redis_crud_service() is None
+        get_redis_crud_service.cache_clear()
         get_settings.return_value = MagicMock(redis_url="")
         assert get_redis_crud_service() is None
+    get_redis_crud_service.cache_clear()
 
 
 def test_get_redis_crud_service_returns_instance_when_url_set() -> None:
     """get_redis_crud_service returns RedisCrudService when redis_url is set."""
     with patch("jewelryops.services.redis.get_settings") as get_settings:
+        get_redis_crud_service.cache_clear()
         get_settings.return_value = MagicMock(redis_url="redis://localhost:6379/0")
         svc = get_redis_crud_service()
         assert svc is not None
         assert isinstance(svc, RedisCrudService)
+        assert get_redis_crud_service() is svc
+        get_settings.assert_called_once()
+    get_redis_crud_service.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_redis_crud_pipeline_setex(mock_redis: MagicMock) -> None:
+    """pipeline_setex queues one setex per item and executes once."""
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[True, True])
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=None)
+    mock_redis.pipeline.return_value = pipe
+    svc = RedisCrudService("redis://localhost:6379/0")
+    svc._client = mock_redis
+    ok = await svc.pipeline_setex([("a", "1", 60), ("b", "2", 30)])
+    assert ok is True
+    mock_redis.pipeline.assert_called_once_with(transaction=False)
+    assert pipe.setex.call_count == 2
+    pipe.setex.assert_any_call("a", 60, "1")
+    pipe.setex.assert_any_call("b", 30, "2")
+    pipe.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_redis_crud_pipeline_setex_when_not_connected() -> None:
+    """pipeline_setex returns False when client is None."""
+    svc = RedisCrudService("redis://localhost:6379/0")
+    assert await svc.pipeline_setex([("a", "1", 60)]) is False
+
+
+@pytest.mark.asyncio
+async def test_redis_crud_set_many_with_ttl(mock_redis: MagicMock) -> None:
+    """set_many with ttl_seconds pipelines one setex per key."""
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[True, True, True])
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=None)
+    mock_redis.pipeline.return_value = pipe
+    svc = RedisCrudService("redis://localhost:6379/0")
+    svc._client = mock_redis
+    ok = await svc.set_many({"a": "1", "b": "2", "c": "3"}, ttl_seconds=60)
+    assert ok is True
+    assert pipe.setex.call_count == 3
+    pipe.setex.assert_any_call("c", 60, "3")
+    pipe.execute.assert_awaited_once()
+    mock_redis.setex.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_redis_crud_set_many_no_ttl(mock_redis: MagicMock) -> None:
+    """set_many without ttl issues a single MSET."""
+    svc = RedisCrudService("redis://localhost:6379/0")
+    svc._client = mock_redis
+    ok = await svc.set_many({"a": "1", "b": "2"})
+    assert ok is True
+    mock_redis.mset.assert_called_once_with({"a": "1", "b": "2"})
+    mock_redis.set.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_close_redis_crud_service_closes_shared_client_once(mock_redis: MagicMock) -> None:
+    """close_redis_crud_service closes the shared client and forgets the service."""
+    with patch("jewelryops.services.redis.get_settings") as get_settings:
+        get_redis_crud_service.cache_clear()
+        get_settings.return_value = MagicMock(redis_url="redis://localhost:6379/0")
+        svc = get_redis_crud_service()
+        svc._client = mock_redis
+        await close_redis_crud_service()
+        await close_redis_crud_service()
+        mock_redis.aclose.assert_awaited_once()
+        assert svc.client is None
+        assert get_redis_crud_service() is not svc
+    get_redis_crud_service.cache_clear()
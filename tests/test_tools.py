@@ -0,0 +1,203 @@
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("autogen")
+pytest.importorskip("mcp")
+
+import httpx
+import openai
+
+from jewelryops.agent import tools
+
+
+def _verdict(action: str) -> bool | None:
+    """Return the local requires_confirmation verdict, or None when deferred to the LLM."""
+    result = tools._confirmation_local(action)
+    return None if result is None else json.loads(result)["requires_confirmation"]
+
+
+@pytest.mark.parametrize(
+    "action",
+    [
+        "read the email and send a reply",
+        "show order and add_note to it",
+        "get order ORD-1, then issue a refund",
+        "email the customer about the delay",
+        "Reply to EMAIL-1",
+        "create_issue for the damaged ring",
+        "Cancelled order ORD-2 needs a refund",
+    ],
+)
+def test_confirmation_local_requires_confirmation_for_writes(action: str) -> None:
+    """Any write verb, including inside tool names, requires confirmation."""
+    assert _verdict(action) is True
+
+
+@pytest.mark.parametrize(
+    "action",
+    [
+        "list open issues",
+        "get order ORD-1",
+        "read the latest email",
+        "get_order ORD-1",
+        "show notes for cust_001",
+        "check_stock RING-101",
+    ],
+)
+def test_confirmation_local_read_only(action: str) -> None:
+    """A single read clause is answered locally without confirmation."""
+    assert _verdict(action) is False
+
+
+@pytest.mark.parametrize(
+    "action",
+    [
+        "get order and customer",
+        "summarize the ticket",
+        "show address, then notify",
+        "get rid of customer cust_001 notes",
+        "fetch order ORD-2038 to archive it",
+        "read receipt: mark order ORD-2038 shipped",
+        "show stock after reserving 3 units of RING-101",
+    ],
+)
+def test_confirmation_local_defers_unclear_actions(action: str) -> None:
+    """Anything beyond a plain read verb, object and ID goes to the LLM."""
+    assert _verdict(action) is None
+
+
+def test_check_requires_confirmation_skips_llm_when_local() -> None:
+    """Locally classified actions never call the tool model."""
+    with patch.object(tools, "_tool_call") as tool_call:
+        result = json.loads(tools.check_requires_confirmation("delete note 5"))
+    assert result["requires_confirmation"] is True
+    tool_call.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ('{"a": 1}', '{"a": 1}'),
+        ('  {"a": {"b": [1, 2]}}\n', '{"a": {"b": [1, 2]}}'),
+        ('Sure! Here it is: {"a": 1} Hope that helps.', '{"a": 1}'),
+        ('Result: {"a": {"b": {"c": 2}}, "d": 3} done', '{"a": {"b": {"c": 2}}, "d": 3}'),
+        ('x {"s": "brace } and { \\" quote"} y', '{"s": "brace } and { \\" quote"}'),
+        ('{"a": 1} and {"b": 2}', '{"a": 1}'),
+        ("no json here", None),
+        ('truncated {"a": {"b": 1}', None),
+    ],
+)
+def test_extract_json_object(text: str, expected: str | None) -> None:
+    """Prose, nesting and braces inside strings yield the first balanced object."""
+    assert tools._extract_json_object(text) == expected
+
+
+def test_extract_json_object_whole_reply_parses_once() -> None:
+    """A reply that is a single JSON value takes the fast path without scanning."""
+    with patch.object(tools, "_loads", wraps=tools._loads) as loads:
+        assert tools._extract_json_object(' {"a": "}"} ') == '{"a": "}"}'
+    loads.assert_called_once_with('{"a": "}"}')
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ('[{"id": 1}]', '[{"id": 1}]'),
+        ('Tools: [["a"], "b ] c"] trailing', '[["a"], "b ] c"]'),
+        ("[unclosed", None),
+        ("nothing", None),
+    ],
+)
+def test_extract_json_array(text: str, expected: str | None) -> None:
+    """Arrays use the same balanced scan with square brackets."""
+    assert tools._extract_json_array(text) == expected
+
+
+def _bad_request() -> openai.BadRequestError:
+    """A 400 like the one a backend without JSON mode returns for response_format."""
+    request = httpx.Request("POST", "http://llm.test/v1/chat/completions")
+    return openai.BadRequestError(
+        "response_format is not supported",
+        response=httpx.Response(400, request=request),
+        body=None,
+    )
+
+
+def _uncached() -> MagicMock:
+    cache = MagicMock()
+    cache.get_local.return_value = None
+    cache.get = AsyncMock(return_value=None)
+    return cache
+
+
+def test_tool_call_api_error_returns_error_payload() -> None:
+    """An API error from the tool model becomes the tool's error JSON."""
+    client = MagicMock()
+    client.chat.completions.create.side_effect = _bad_request()
+    with patch.object(tools, "get_llm_cache", return_value=_uncached()), patch.object(
+        tools, "_make_tool_client", return_value=client
+    ):
+        result = json.loads(tools.extract_entities("order ORD-1"))
+    assert result["order_ids"] == []
+    assert "response_format is not supported" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_tool_call_async_api_error_returns_error_payload() -> None:
+    """The async helper also routes API errors through on_error."""
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(side_effect=_bad_request())
+    with patch.object(tools, "get_llm_cache", return_value=_uncached()), patch.object(
+        tools, "_make_async_tool_client", return_value=client
+    ):
+        result = json.loads(await tools.summarize_state_async("history"))
+    assert result["summary"] == "Unable to summarize"
+    assert "response_format is not supported" in result["error"]
+
+
+def _replying(content: str) -> MagicMock:
+    client = MagicMock()
+    client.chat.completions.create.return_value.choices = [
+        MagicMock(message=MagicMock(content=content))
+    ]
+    return client
+
+
+def test_extract_entities_batch_rejects_object_reply() -> None:
+    """An object reply never yields its nested array as the entity row."""
+    client = _replying('{"skus": ["RING-101"], "customer_ids": [], "order_ids": []}')
+    with patch.object(tools, "get_llm_cache", return_value=_uncached()), patch.object(
+        tools, "_make_tool_client", return_value=client
+    ):
+        rows = json.loads(tools.extract_entities_batch(["ring RING-101"]))
+    assert len(rows) == 1
+    assert rows[0]["skus"] == []
+    assert "expected a JSON array" in rows[0]["error"]
+
+
+def test_extract_entities_batch_accepts_top_level_array() -> None:
+    """A top-level array (even wrapped in prose) uses the batch prompt and maps rows in order."""
+    row = {"customer_ids": [], "order_ids": ["ORD-1"], "skus": []}
+    client = _replying(f"Here you go: {json.dumps([row, row])}")
+    with patch.object(tools, "get_llm_cache", return_value=_uncached()), patch.object(
+        tools, "_make_tool_client", return_value=client
+    ):
+        rows = json.loads(tools.extract_entities_batch(["order ORD-1", "ORD-1 again"]))
+    assert rows == [row, row]
+    request = client.chat.completions.create.call_args.kwargs
+    assert request["messages"][0]["content"] == tools.get_settings().extract_entities_batch_system_prompt
+    assert "response_format" not in request
+
+
+@pytest.mark.parametrize(
+    "reply",
+    ['{"skus": ["RING-101"]}', '["RING-101"]', "no json"],
+)
+def test_entities_batch_rows_error_row_for_non_object_rows(reply: str) -> None:
+    """Anything but a top-level array of objects becomes an error row."""
+    content = tools._extract_top_level_json_array(reply) or reply
+    rows = tools._entities_batch_rows(content, 1)
+    assert set(rows[0]) == {"customer_ids", "order_ids", "skus", "error"}